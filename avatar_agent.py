@@ -14,6 +14,11 @@ from livekit import agents, rtc
 from livekit.agents import AgentSession, JobContext
 from livekit.plugins import anam
 
+from session_registry import SessionRegistry, session_key
+from http_pool import close_http_clients
+from pipeline_metrics import AVATAR_START, AVATAR_STOP, PIPELINE_METRICS, metrics_server
+from loop_monitor import loop_monitor
+
 # Load environment variables from .env
 load_dotenv('.env')
 
@@ -61,8 +66,9 @@ class AnamAvatarAgent:
             )
             
             # Start avatar session
-            await self.avatar_session.start(self.session, room=room)
-            await self.session.start()
+            with PIPELINE_METRICS.time(AVATAR_START):
+                await self.avatar_session.start(self.session, room=room)
+                await self.session.start()
             
             self.is_active = True
             logger.info("✅ Anam.ai avatar started successfully!")
@@ -76,13 +82,14 @@ class AnamAvatarAgent:
         try:
             logger.info("🛑 Stopping Anam.ai avatar...")
             
-            if self.avatar_session:
-                await self.avatar_session.stop()
-                self.avatar_session = None
-                
-            if self.session:
-                await self.session.stop()
-                self.session = None
+            with PIPELINE_METRICS.time(AVATAR_STOP):
+                if self.avatar_session:
+                    await self.avatar_session.stop()
+                    self.avatar_session = None
+                    
+                if self.session:
+                    await self.session.stop()
+                    self.session = None
                 
             self.is_active = False
             logger.info("✅ Anam.ai avatar stopped")
@@ -105,6 +112,7 @@ class AnamAvatarAgent:
         # Stop avatar when no participants remain
         if len(participant.room.remote_participants) == 0:
             await self.stop_avatar()
+            logger.info(f"⏱️ Event-loop lag: {loop_monitor.stats()}")
 
     async def handle_track_subscribed(self, track: rtc.Track, publication: rtc.TrackPublication, participant: rtc.RemoteParticipant):
         """Handle when a track is subscribed"""
@@ -114,14 +122,29 @@ class AnamAvatarAgent:
         """Handle when a track is unsubscribed"""
         logger.info(f"📹 Track unsubscribed: {track.kind} from {participant.identity}")
 
-# Global agent instance
-avatar_agent = AnamAvatarAgent()
+# Per-room agent instances, so one worker process can host many rooms
+sessions = SessionRegistry(lambda key: AnamAvatarAgent(), cleanup=lambda agent: agent.stop_avatar())
 
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for the LiveKit agent"""
     logger.info("🚀 LiveKit Agent with Anam.ai Avatar starting...")
     
     room = ctx.room
+    key = session_key(ctx)
+    
+    # One metrics endpoint and event-loop monitor per worker process (no-ops once started)
+    await metrics_server.start()
+    loop_monitor.start()
+    
+    avatar_agent = sessions.get_or_create(key)
+    
+    async def release_session():
+        await sessions.release(key)
+        # Last consultation in this worker: drain and close the shared HTTP pool (recreated on next use)
+        if not sessions:
+            await close_http_clients()
+    
+    ctx.add_shutdown_callback(release_session)
     
     # Set up room event handlers
     @room.on("participant_connected")
@@ -148,7 +171,7 @@ async def entrypoint(ctx: JobContext):
             await asyncio.sleep(1)
     except KeyboardInterrupt:
         logger.info("🛑 Agent shutting down...")
-        await avatar_agent.stop_avatar()
+        await sessions.release(key)
 
 if __name__ == "__main__":
     # Run the agent
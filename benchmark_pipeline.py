@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the enhanced agent's frame pipeline
+Drives EnhancedAnamAgent.process_video_track with synthetic video at a chosen
+resolution and fps against the in-process fake vision backend, then reports
+throughput, CPU per frame, memory growth, end-to-end latency percentiles and
+vision API calls as JSON, so runs can be compared between releases.
+
+Usage:
+    python benchmark_pipeline.py --width 1280 --height 720 --fps 15 --duration 30
+    python benchmark_pipeline.py --output bench.json --baseline last_release.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+def configure_offline_environment(workdir: str, latency_ms: float, latency_sigma: float, seed: int):
+    """Point the agent at the fake backend and scratch storage; must run before importing it"""
+    os.environ.update({
+        "VISION_BACKEND": "fake",
+        "VISION_FAKE_SEED": str(seed),
+        "VISION_FAKE_LATENCY_MS": str(latency_ms),
+        "VISION_FAKE_LATENCY_SIGMA": str(latency_sigma),
+        "VISION_FAKE_ERROR_RATE": "0",
+        "RATE_LIMIT_ENABLED": "false",  # The fake backend has no quota, and shedding would make runs non-deterministic
+        "INVENTORY_DB_PATH": os.path.join(workdir, "inventory.db"),
+        "INVENTORY_JOURNAL_DIR": os.path.join(workdir, "journals"),
+    })
+    os.environ.pop("VISION_CACHE_DIR", None)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values, default=0.0) * 1000,
+    }
+
+
+async def run_benchmark(args) -> Dict:
+    import enhanced_anam_agent as agent_module
+    from loop_monitor import loop_monitor
+    from pipeline_metrics import PIPELINE_METRICS
+    from synthetic_video import SyntheticRoomVideo, SyntheticVideoTrack
+
+    class BenchmarkAgent(agent_module.EnhancedAnamAgent):
+        """Records per-frame timings around the real pipeline methods"""
+
+        def __init__(self):
+            super().__init__()
+            self.frame_latencies: List[float] = []
+            self.result_latencies: List[float] = []
+
+        async def process_video_frame(self, frame, track_key="default", received_at=None):
+            start = time.perf_counter()
+            await super().process_video_frame(frame, track_key, received_at)
+            self.frame_latencies.append(time.perf_counter() - start)
+
+        async def handle_vision_result(self, job, detection):
+            await super().handle_vision_result(job, detection)
+            if job.captured_at is not None:
+                self.result_latencies.append(time.monotonic() - job.captured_at)
+
+    agent = BenchmarkAgent()
+    agent.open_consultation(f"benchmark-{int(time.time())}")
+    loop_monitor.start()
+
+    participant = SimpleNamespace(identity="benchmark-user")
+    tracks = [
+        SyntheticVideoTrack(
+            SyntheticRoomVideo(args.width, args.height, args.fps, args.scene_seconds, seed=args.seed + i),
+            args.duration, sid=f"TR_bench{i}",
+        )
+        for i in range(args.tracks)
+    ]
+
+    rss_start = rss_bytes()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    await asyncio.gather(*(agent.process_video_track(track, participant) for track in tracks))
+    await agent.vision_pool.stop()  # Let in-flight analyses land
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    rss_end = rss_bytes()
+
+    frames_offered = sum(track.frames_sent for track in tracks)
+    frames_processed = len(agent.frame_latencies)
+    pool_stats = agent.vision_pool.stats()
+    results = {
+        "wall_seconds": wall,
+        "frames_offered": frames_offered,
+        "frames_processed": frames_processed,
+        "throughput_fps": frames_processed / wall if wall else 0.0,
+        "cpu_ms_per_frame": cpu / frames_processed * 1000 if frames_processed else 0.0,
+        "cpu_utilization": cpu / wall if wall else 0.0,
+        "rss_start_mb": rss_start / 2**20,
+        "rss_end_mb": rss_end / 2**20,
+        "rss_growth_mb": (rss_end - rss_start) / 2**20,
+        "api_calls": pool_stats["requests"],
+        "api_calls_per_minute": pool_stats["requests"] / wall * 60 if wall else 0.0,
+        "frame_processing": latency_summary(agent.frame_latencies),
+        "end_to_end": latency_summary(agent.result_latencies),
+    }
+    report = {
+        "benchmark": "pipeline",
+        "format_version": 1,
+        "timestamp": time.time(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: getattr(args, k) for k in
+                   ("width", "height", "fps", "duration", "tracks", "scene_seconds", "latency_ms", "latency_sigma",
+                    "seed")},
+        "results": results,
+        "stages": PIPELINE_METRICS.summary(),
+        "vision_pool": pool_stats,
+        "dedup": agent.deduplicator.stats(),
+        "encoder": agent_module.frame_encoder.stats(),
+        "inventory": agent.inventory_store.stats(),
+        "loop": loop_monitor.stats(),
+    }
+
+    loop_monitor.stop()
+    await agent.close()
+    return report
+
+
+# Metrics where a larger value is a regression, compared against --baseline
+REGRESSION_METRICS = [
+    ("cpu_ms_per_frame",),
+    ("rss_growth_mb",),
+    ("api_calls",),
+    ("frame_processing", "p99_ms"),
+    ("end_to_end", "p50_ms"),
+    ("end_to_end", "p99_ms"),
+]
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than the tolerance (fraction)"""
+    regressions = []
+    for path in REGRESSION_METRICS:
+        current, previous = report["results"], baseline["results"]
+        for key in path:
+            current, previous = current.get(key), previous.get(key)
+            if current is None or previous is None:
+                break
+        if isinstance(current, (int, float)) and isinstance(previous, (int, float)) and previous > 0 \
+                and current > previous * (1 + tolerance):
+            regressions.append(f"{'.'.join(path)}: {previous:.2f} -> {current:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline frame-pipeline benchmark with synthetic video")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of video per track")
+    parser.add_argument("--tracks", type=int, default=1, help="Concurrent video tracks")
+    parser.add_argument("--scene-seconds", type=float, default=6.0, help="Seconds before the camera enters a new room")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median fake vision latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal latency spread")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression vs baseline (fraction)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dave-bench-") as workdir:
+        configure_offline_environment(workdir, args.latency_ms, args.latency_sigma, args.seed)
+        report = asyncio.run(run_benchmark(args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        results = report["results"]
+        print(f"📊 {results['throughput_fps']:.1f} fps, {results['cpu_ms_per_frame']:.1f} ms CPU/frame, "
+              f"e2e p99 {results['end_to_end']['p99_ms']:.0f} ms, {results['api_calls']} API calls "
+              f"-> {args.output}")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,10 @@ load_dotenv('config.env')
 from livekit.agents import Agent, AgentSession, JobContext
 from livekit.plugins import anam
 
+# Event-loop lag monitoring, exported on the local metrics endpoint
+from loop_monitor import loop_monitor
+from pipeline_metrics import metrics_server
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -90,6 +94,10 @@ async def entrypoint(ctx: JobContext):
     """Main entrypoint for Dave's LiveKit agent"""
     logger.info("🏠 Dave - Professional Moving Consultant Agent Starting...")
     
+    # Avatar stutter usually means a blocked loop; record lag and the blocking stack
+    await metrics_server.start()
+    loop_monitor.start()
+    
     try:
         # Create agent session
         session = AgentSession()
@@ -139,6 +147,7 @@ async def entrypoint(ctx: JobContext):
                 await asyncio.sleep(1)
         except KeyboardInterrupt:
             logger.info("🛑 Dave's agent shutting down...")
+            logger.info(f"⏱️ Event-loop lag: {loop_monitor.stats()}")
             
     except Exception as e:
         logger.error(f"❌ Error starting Dave's agent: {e}")
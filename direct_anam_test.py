@@ -8,9 +8,10 @@ import asyncio
 import os
 import logging
 from dotenv import load_dotenv
-import aiohttp
 import json
 
+from http_pool import close_http_clients, get_http_session
+
 # Load environment variables
 load_dotenv('.env')
 
@@ -41,21 +42,22 @@ async def test_anam_connection():
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
-            # Try to get persona info (this is the correct endpoint for personas)
-            url = f"https://api.anam.ai/v1/personas/{ANAM_AVATAR_ID}"
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    avatar_data = await response.json()
-                    logger.info("✅ Anam.ai API connection successful!")
-                    logger.info(f"  Avatar Name: {avatar_data.get('name', 'Unknown')}")
-                    logger.info(f"  Avatar Status: {avatar_data.get('status', 'Unknown')}")
-                    return True
-                else:
-                    logger.error(f"❌ Anam.ai API error: {response.status}")
-                    logger.error(f"  Response: {await response.text()}")
-                    return False
-                    
+        # Shared keep-alive pool instead of a fresh session (and TLS handshake) per call
+        session = get_http_session()
+        # Try to get persona info (this is the correct endpoint for personas)
+        url = f"https://api.anam.ai/v1/personas/{ANAM_AVATAR_ID}"
+        async with session.get(url, headers=headers) as response:
+            if response.status == 200:
+                avatar_data = await response.json()
+                logger.info("✅ Anam.ai API connection successful!")
+                logger.info(f"  Avatar Name: {avatar_data.get('name', 'Unknown')}")
+                logger.info(f"  Avatar Status: {avatar_data.get('status', 'Unknown')}")
+                return True
+            else:
+                logger.error(f"❌ Anam.ai API error: {response.status}")
+                logger.error(f"  Response: {await response.text()}")
+                return False
+                
     except Exception as e:
         logger.error(f"❌ Error connecting to Anam.ai: {e}")
         return False
@@ -87,6 +89,8 @@ async def main():
     # Test LiveKit connection
     livekit_success = await test_livekit_connection()
     
+    await close_http_clients()
+    
     logger.info("\n📊 Test Results:")
     logger.info(f"  Anam.ai API: {'✅ Working' if anam_success else '❌ Failed'}")
     logger.info(f"  LiveKit: {'✅ Working' if livekit_success else '❌ Failed'}")
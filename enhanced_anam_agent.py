@@ -7,13 +7,12 @@ for moving consultation meetings.
 
 import asyncio
 import os
-import io
 import time
-import base64
 import json
 import logging
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,7 +20,7 @@ load_dotenv('config.env')
 
 # LiveKit Agents framework
 from livekit import agents, rtc
-from livekit.agents import AgentSession, JobContext
+from livekit.agents import AgentSession, AutoSubscribe, JobContext
 from livekit.agents.pipeline import VideoSource, AudioSource
 from livekit.agents.rtc import subscribe_remote_tracks, publish_audio_track, publish_video_track
 from livekit.agents.utils import video_frame_to_image
@@ -29,8 +28,41 @@ from livekit.agents.utils import video_frame_to_image
 # Anam.ai integration
 from livekit.plugins import anam
 
-# Vision model (OpenAI)
-from openai import OpenAI
+# Vision model backends (OpenAI, local stand-in, in-process fake)
+from vision_backends import create_vision_backend, unknown_detection
+from vision_resilience import ResilientVisionBackend
+from rate_limiter import CAPTURE, NEW_SCENE, REFRESH, estimate_tokens, rate_limiter
+
+# Local frame pre-stages, deduplication and result caching
+from frame_quality import QUALITY_CONFIG, FrameQualityGate
+from scene_detector import SAME_VIEW, SCENE_CONFIG, SceneChangeDetector
+from frame_fingerprint import FrameDeduplicator, dhash
+from vision_cache import VisionResultCache
+
+# Async vision execution
+from vision_worker import VisionJob, VisionWorkerPool
+from frame_encoder import FrameEncoder
+from frame_mailbox import FrameMailbox, read_track_into_mailbox
+from frame_store import RECORDER_CONFIG, FrameRecorder
+from simulcast_controller import CAPTURE_TOPIC, SimulcastController
+
+# Incremental inventory with cross-frame fusion and canonical item names
+from inventory_store import INVENTORY_CONFIG, InventoryDelta, InventoryStore
+from item_canonicalizer import ItemCanonicalizer
+from inventory_journal import JOURNAL_CONFIG, InventoryJournal, JournalError, recover_session
+from inventory_db import INVENTORY_DB_CONFIG, InventoryDatabase
+from inventory_protocol import INVENTORY_TOPIC, PROTOCOL_CONFIG, RESYNC_TOPIC, InventoryProtocol
+
+# Per-stage latency histograms served on a local Prometheus endpoint
+from pipeline_metrics import (
+    AVATAR_START, AVATAR_STOP, CONVERT, ENCODE, END_TO_END, FRAME_RECEIVE, INVENTORY_MERGE, PIPELINE_METRICS, PUBLISH,
+    QUEUE_WAIT, VISION_REQUEST, metrics_server,
+)
+from loop_monitor import loop_monitor
+
+# One isolated consultation per room/job
+from session_registry import SessionRegistry, consultation_id, session_key
+from http_pool import close_http_clients
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -43,19 +75,17 @@ ANAM_CONFIG = {
     "avatar_name": os.getenv("ANAM_AVATAR_NAME", "Dave"),
 }
 
-# OpenAI Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY:
-    oai = OpenAI(api_key=OPENAI_API_KEY)
-else:
-    logger.warning("⚠️ OPENAI_API_KEY not set - vision analysis will be limited")
-
-# System prompt for moving consultation
-SYSTEM_PROMPT = (
-    "You are Dave, a professional moving consultant. Analyze the room and provide a detailed inventory. "
-    "Respond with JSON only in this format: "
-    '{"room_type": "bedroom/kitchen/living_room/etc", "items":[{"name":"item_name", "qty":1, "size":"small/medium/large", "fragile":true/false}], "notes":"additional_observations"}'
-)
+# Shared off-loop frame conversion/encoding pool
+frame_encoder = FrameEncoder(video_frame_to_image)
+
+# Vision backend selected by VISION_BACKEND, with timeouts, retries, hedging and a circuit breaker
+vision_backend = ResilientVisionBackend(create_vision_backend())
+
+# Shared, memoized item-name canonicalization (vocabulary from item_vocabulary.json)
+item_canonicalizer = ItemCanonicalizer()
+
+# Shared SQLite store for every consultation's inventory (writes run on its own thread)
+inventory_db = InventoryDatabase() if INVENTORY_DB_CONFIG["enabled"] else None
 
 @dataclass
 class SessionState:
@@ -64,14 +94,53 @@ class SessionState:
     consultation_notes: List[str] = field(default_factory=list)
     current_room: str = "unknown"
 
-state = SessionState()
+@dataclass
+class TrackPipeline:
+    """Per-track local pre-stage state (motion and scene comparisons only make sense within one camera)"""
+    quality_gate: Optional[FrameQualityGate] = None
+    pre_stages: List = field(default_factory=list)
+    scene_detector: Optional[SceneChangeDetector] = None
+    mailbox: Optional[FrameMailbox] = None
+    simulcast: Optional[SimulcastController] = None
+    capture_requested: bool = False  # Next frame is captured at full resolution, bypassing the pre-stages
+
+    @classmethod
+    def create(cls) -> "TrackPipeline":
+        # Pluggable local pre-stages run before hashing; each exposes should_analyze(img) and stats()
+        quality_gate = FrameQualityGate() if QUALITY_CONFIG["enabled"] else None
+        pre_stages = [quality_gate] if quality_gate else []
+        scene_detector = SceneChangeDetector() if SCENE_CONFIG["enabled"] else None
+        if scene_detector:
+            pre_stages.append(scene_detector)
+        return cls(quality_gate=quality_gate, pre_stages=pre_stages, scene_detector=scene_detector)
+
+    def frame_priority(self, user_capture: bool) -> int:
+        """Rate-limit class for a frame that passed the pre-stages: capture > new scene > settled-view refresh"""
+        if user_capture:
+            return CAPTURE
+        if self.scene_detector and self.scene_detector.last_label == SAME_VIEW:
+            return REFRESH
+        return NEW_SCENE
 
 class EnhancedAnamAgent:
-    def __init__(self):
+    def __init__(self, state: Optional[SessionState] = None):
+        self.state = state or SessionState()
+        self.inventory_store = InventoryStore(self.state.inventory, canonicalize=item_canonicalizer.canonicalize)
+        self.journal: Optional[InventoryJournal] = None
+        self.protocol = InventoryProtocol()
+        self.consultation_id: Optional[str] = None
+        self.consultation_finished = False  # Final summary sent; the journal is no longer needed for recovery
         self.session: Optional[AgentSession] = None
         self.avatar_session: Optional[anam.AvatarSession] = None
         self.is_active = False
         self.room = None
+        self.tracks: Dict[str, TrackPipeline] = {}
+        self.track_tasks: Dict[str, asyncio.Task] = {}
+        self.deduplicator = FrameDeduplicator()
+        self.quality_totals: Counter = Counter()  # Quality-gate counts from tracks that have ended
+        self.vision_cache = VisionResultCache()
+        self.vision_pool = VisionWorkerPool(self.call_vision_analysis_batch, self.handle_vision_result,
+                                            admit=self.admit_vision_batch, on_discard=self.release_vision_job)
 
     async def start_avatar(self, room: rtc.Room):
         """Start the Anam.ai avatar session with enhanced capabilities"""
@@ -95,8 +164,9 @@ class EnhancedAnamAgent:
             )
             
             # Start avatar session
-            await self.avatar_session.start(self.session, room=room)
-            await self.session.start()
+            with PIPELINE_METRICS.time(AVATAR_START):
+                await self.avatar_session.start(self.session, room=room)
+                await self.session.start()
             
             self.is_active = True
             logger.info("✅ Enhanced Anam.ai avatar started successfully!")
@@ -116,13 +186,14 @@ class EnhancedAnamAgent:
         try:
             logger.info("🛑 Stopping Enhanced Anam.ai avatar...")
             
-            if self.avatar_session:
-                await self.avatar_session.stop()
-                self.avatar_session = None
-                
-            if self.session:
-                await self.session.stop()
-                self.session = None
+            with PIPELINE_METRICS.time(AVATAR_STOP):
+                if self.avatar_session:
+                    await self.avatar_session.stop()
+                    self.avatar_session = None
+                    
+                if self.session:
+                    await self.session.stop()
+                    self.session = None
                 
             self.is_active = False
             logger.info("✅ Enhanced Anam.ai avatar stopped")
@@ -134,72 +205,121 @@ class EnhancedAnamAgent:
         """Send a consultation message via LiveKit data channel"""
         try:
             if self.room:
-                await self.room.local_participant.publish_data(
-                    message.encode("utf-8"), reliable=True
-                )
+                with PIPELINE_METRICS.time(PUBLISH):
+                    await self.room.local_participant.publish_data(
+                        message.encode("utf-8"), reliable=True
+                    )
                 logger.info(f"📤 Sent consultation message: {message}")
         except Exception as e:
             logger.error(f"❌ Error sending message: {e}")
 
-    def call_vision_analysis(self, image_bytes: bytes) -> dict:
+    async def publish_inventory(self, packets: List[bytes]):
+        """Send binary inventory protocol packets to the meeting UI on the inventory topic"""
+        if not self.room or not packets or not PROTOCOL_CONFIG["enabled"]:
+            return
+        try:
+            with PIPELINE_METRICS.time(PUBLISH):
+                for packet in packets:
+                    await self.room.local_participant.publish_data(packet, reliable=True, topic=INVENTORY_TOPIC)
+        except Exception as e:
+            logger.error(f"❌ Error publishing inventory update: {e}")
+
+    async def send_inventory_snapshot(self, final: bool = False):
+        """Send the full inventory (on resync requests, late joins and at the end of the consultation)"""
+        await self.publish_inventory(
+            self.protocol.snapshot(self.state.inventory, self.state.current_room, final=final)
+        )
+
+    async def call_vision_analysis(self, image_bytes: bytes) -> dict:
         """Analyze room image for inventory"""
-        if not OPENAI_API_KEY:
-            return {"room_type": "unknown", "items": [], "notes": "Vision analysis not available"}
+        return (await self.call_vision_analysis_batch([image_bytes]))[0]
+
+    async def call_vision_analysis_batch(self, images: List[bytes], priority: int = NEW_SCENE) -> List[dict]:
+        """Analyze one or more room images with the configured backend, one detection per image"""
+        async def acquire(wait: bool = True) -> bool:
+            # Retries and hedges spend quota at the same priority as the original request
+            return await rate_limiter.acquire(self.consultation_id or "default", priority,
+                                              estimate_tokens(len(images)), wait=wait)
         
         try:
-            b64 = base64.b64encode(image_bytes).decode()
-            resp = oai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": [
-                        {"type": "text", "text": "Analyze this room for moving inventory."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}}
-                    ]}
-                ],
-                temperature=0.2,
-            )
-            txt = resp.choices[0].message.content
-            try:
-                return json.loads(txt)
-            except:
-                return {"room_type": "unknown", "items": [], "notes": txt}
+            with PIPELINE_METRICS.time(VISION_REQUEST):
+                return await vision_backend.analyze(images, acquire=acquire)
         except Exception as e:
             logger.error(f"❌ Vision analysis error: {e}")
-            return {"room_type": "unknown", "items": [], "notes": f"Analysis error: {e}"}
+            return [unknown_detection(f"Analysis error: {e}", error=True) for _ in images]
+
+    async def admit_vision_batch(self, batch: List[VisionJob]) -> bool:
+        """Wait for a share of the worker-wide provider quota at the batch's most important priority"""
+        priority = min(job.priority for job in batch)
+        return await rate_limiter.acquire(self.consultation_id or "default", priority, estimate_tokens(len(batch)))
+
+    def open_consultation(self, consultation_id: str, room_name: Optional[str] = None):
+        """Record the consultation in the database, recover it from its journal (after a crash/restart) and keep journaling it"""
+        if self.consultation_id:
+            return
+        self.consultation_id = consultation_id
+        
+        # One cache per consultation, kept across avatar restarts and reloaded from disk after a worker restart
+        self.vision_cache = VisionResultCache.for_consultation(consultation_id)
+        if inventory_db:
+            inventory_db.submit(inventory_db.start_session, consultation_id, room_name or consultation_id)
+        
+        if not JOURNAL_CONFIG["enabled"]:
+            return
+        
+        recovered = recover_session(consultation_id)
+        if recovered:
+            self.state = SessionState(
+                inventory=recovered["inventory"],
+                consultation_notes=recovered["notes"],
+                current_room=recovered["current_room"],
+            )
+            self.inventory_store = InventoryStore(self.state.inventory, canonicalize=item_canonicalizer.canonicalize)
+        
+        self.journal = InventoryJournal(consultation_id)
+        self.journal.start()
+
+    def write_journal(self, write: Callable[[InventoryJournal], None]):
+        """Run one journal write; a failed journal is logged once and left as it was (recovery resumes from there)"""
+        if not self.journal:
+            return
+        try:
+            write(self.journal)
+        except JournalError as e:
+            logger.error(f"❌ {e}; no longer journaling this consultation")
 
-    def add_to_inventory(self, detection: dict):
-        """Add detected items to inventory"""
+    def add_to_inventory(self, detection: dict) -> List[InventoryDelta]:
+        """Fuse detected items into the inventory, journal the changes and return them"""
         room = detection.get("room_type", "unknown")
-        state.current_room = room
-        state.inventory.setdefault(room, {})
+        if room != self.state.current_room:
+            self.write_journal(lambda journal: journal.append("room", room=room))
+        self.state.current_room = room
+        self.inventory_store.observe(room, detection.get("items", []))
+        deltas = self.inventory_store.drain_deltas()
         
-        for item in detection.get("items", []):
-            name = item.get("name", "item").lower().strip()
-            qty = int(item.get("qty", 1))
-            size = item.get("size", "medium")
-            fragile = item.get("fragile", False)
-            
-            if name in state.inventory[room]:
-                state.inventory[room][name]["qty"] += qty
-            else:
-                state.inventory[room][name] = {
-                    "qty": qty,
-                    "size": size,
-                    "fragile": fragile
-                }
+        # Add notes (skipping repeats, bounded for long sessions)
+        notes = self.state.consultation_notes
+        note = f"{room}: {detection['notes']}" if detection.get("notes") else None
+        if note and note not in notes[-20:]:
+            notes.append(note)
+            del notes[:-INVENTORY_CONFIG["max_notes"]]
+            self.write_journal(lambda journal: journal.append("note", text=note))
+            if inventory_db and self.consultation_id:
+                inventory_db.submit(inventory_db.add_note, self.consultation_id, note)
         
-        # Add notes
-        if detection.get("notes"):
-            state.consultation_notes.append(f"{room}: {detection['notes']}")
+        self.write_journal(lambda journal: journal.append_deltas(deltas))
+        self.write_journal(lambda journal: journal.maybe_snapshot(self.state))
+        if inventory_db and self.consultation_id and deltas:
+            inventory_db.submit(inventory_db.apply_deltas, self.consultation_id, deltas, room)
+        return deltas
 
     def generate_inventory_summary(self) -> str:
         """Generate a summary of the current inventory"""
-        if not state.inventory:
+        if not self.state.inventory:
             return "No items detected yet. Please show me around the room."
         
         summary = []
-        for room, items in state.inventory.items():
+        for room, items in self.state.inventory.items():
             if items:
                 room_items = []
                 for name, details in items.items():
@@ -212,42 +332,215 @@ class EnhancedAnamAgent:
         
         return "\n".join(summary) if summary else "No items detected yet."
 
-    async def process_video_frame(self, frame):
+    async def process_video_frame(self, frame, track_key: str = "default", received_at: Optional[float] = None):
         """Process video frame for inventory analysis"""
+        received_at = received_at or time.monotonic()
         try:
-            # Convert frame to image
-            img = video_frame_to_image(frame)
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=85)
+            pipeline = self.tracks.get(track_key)
+            if pipeline is None:
+                pipeline = self.tracks[track_key] = TrackPipeline.create()
             
-            # Analyze with vision
-            detection = self.call_vision_analysis(buf.getvalue())
-            self.add_to_inventory(detection)
+            # Convert and downscale frame off the event loop
+            with PIPELINE_METRICS.time(CONVERT):
+                img = await frame_encoder.to_image(frame)
             
-            # Send periodic updates
-            now = time.time()
-            if now - state.last_emit_ts > 15:  # Every 15 seconds
-                if detection.get("room_type") != "unknown":
-                    message = f"I can see this is a {detection['room_type']}. "
-                    if detection.get("items"):
-                        message += f"I've detected {len(detection['items'])} items. "
-                    message += "Please continue showing me around for a complete inventory."
-                else:
-                    message = "I'm having trouble seeing clearly. Please ensure good lighting and show items slowly."
+            frame_hash = dhash(img, self.deduplicator.hash_size)
+            user_capture = pipeline.capture_requested
+            pipeline.capture_requested = False
+            
+            if not user_capture:
+                # Only usable frames of new scenes and settled views get past the local pre-stages
+                if not all(stage.should_analyze(img) for stage in pipeline.pre_stages):
+                    await self.send_quality_hint(pipeline)
+                    return
+                
+                # Skip frames too similar to recently analyzed ones
+                if not self.deduplicator.should_analyze(img, frame_hash):
+                    return
                 
-                await self.send_consultation_message(message)
-                state.last_emit_ts = now
+                # Serve views we have already paid for from the cache
+                cached = self.vision_cache.get(frame_hash)
+                if cached is not None:
+                    self.deduplicator.commit(frame_hash, cached=True)
+                    await self.handle_detection(cached)
+                    return
+            
+            # Provider outage: pause analysis rather than queue frames that would fail
+            if not vision_backend.available():
+                return
+            
+            # Grab this keyframe from the high simulcast layer when available
+            if pipeline.simulcast and pipeline.mailbox:
+                high_res = await pipeline.simulcast.capture(pipeline.mailbox, frame)
+                if high_res is not frame:
+                    with PIPELINE_METRICS.time(CONVERT):
+                        img = await frame_encoder.to_image(high_res)
+            
+            with PIPELINE_METRICS.time(ENCODE):
+                image_bytes = await frame_encoder.encode(img)
+            
+            # Hand off to the vision workers without waiting for the result
+            job = VisionJob(image_bytes, frame_hash, key=track_key, capture=user_capture,
+                            priority=pipeline.frame_priority(user_capture), captured_at=received_at)
+            # The view only counts as seen once its analysis succeeds; until then copies of it are held back
+            if not user_capture:
+                self.deduplicator.reserve(frame_hash)
+            if not self.vision_pool.submit(job):
+                self.release_vision_job(job)
+                logger.debug("Vision queue full - frame rejected")
                 
         except Exception as e:
             logger.error(f"❌ Error processing video frame: {e}")
 
+    def quality_stats(self) -> Dict[str, int]:
+        """Accepted and rejected frame counts by reason for the whole session (ended and live tracks)"""
+        totals = Counter(self.quality_totals)
+        for pipeline in self.tracks.values():
+            if pipeline.quality_gate:
+                totals.update(pipeline.quality_gate.stats())
+        return dict(totals)
+
+    async def send_quality_hint(self, pipeline: TrackPipeline):
+        """Tell the user about lighting/camera motion locally, without a vision call"""
+        if not pipeline.quality_gate:
+            return
+        
+        now = time.time()
+        if now - self.state.last_emit_ts <= 15:
+            return
+        
+        hint = pipeline.quality_gate.pending_hint()
+        if hint:
+            await self.send_consultation_message(hint)
+            self.state.last_emit_ts = now
+
+    async def handle_vision_result(self, job: VisionJob, detection: dict):
+        """Cache a completed vision result and merge it into the session"""
+        if job.started_at is not None:
+            PIPELINE_METRICS.observe(QUEUE_WAIT, job.started_at - job.submitted_at)
+        
+        # Failed requests are not observations; keep error text out of the inventory and notes
+        if detection.get("error"):
+            self.release_vision_job(job)
+            return
+        if not job.capture:
+            self.deduplicator.commit(job.frame_hash)
+        
+        # Only cache real analyses, not error/unavailable placeholders
+        if job.frame_hash is not None and (detection.get("items") or detection.get("room_type") != "unknown"):
+            self.vision_cache.put(job.frame_hash, detection)
+        if inventory_db and self.consultation_id:
+            inventory_db.submit(
+                inventory_db.record_frame, self.consultation_id, detection.get("room_type", "unknown"),
+                job.frame_hash, job.capture, job.image_bytes if job.capture else None,
+            )
+        await self.handle_detection(detection)
+        if job.captured_at is not None:
+            PIPELINE_METRICS.observe(END_TO_END, time.monotonic() - job.captured_at)
+
+    def release_vision_job(self, job: VisionJob):
+        """A queued frame was dropped, shed or failed: let the same view be sent again"""
+        if not job.capture:
+            self.deduplicator.release(job.frame_hash)
+
+    async def handle_detection(self, detection: dict):
+        """Merge a completed vision result into the session and send periodic updates"""
+        previous_room = self.state.current_room
+        with PIPELINE_METRICS.time(INVENTORY_MERGE):
+            deltas = self.add_to_inventory(detection)
+        
+        # Live inventory for the meeting UI: only what changed
+        if self.state.current_room != previous_room:
+            await self.publish_inventory(self.protocol.room_changed(self.state.current_room))
+        # Persist-only bookkeeping (sightings, small confidence moves) stays out of the data channel
+        await self.publish_inventory(self.protocol.deltas([d for d in deltas if d.visible]))
+        
+        # Send periodic updates
+        now = time.time()
+        if now - self.state.last_emit_ts > 15:  # Every 15 seconds
+            if detection.get("room_type") != "unknown":
+                message = f"I can see this is a {detection['room_type']}. "
+                if detection.get("items"):
+                    message += f"I've detected {len(detection['items'])} items. "
+                message += "Please continue showing me around for a complete inventory."
+            else:
+                message = "I'm having trouble seeing clearly. Please ensure good lighting and show items slowly."
+            
+            await self.send_consultation_message(message)
+            self.state.last_emit_ts = now
+
+    def request_capture(self, participant_identity: str):
+        """Capture the next frame of each of a participant's video tracks at full resolution"""
+        for track_key, pipeline in self.tracks.items():
+            if track_key.startswith(f"{participant_identity}/"):
+                pipeline.capture_requested = True
+        logger.info(f"📸 Capture requested by {participant_identity}")
+
+    async def process_video_track(self, track: rtc.Track, participant: rtc.RemoteParticipant,
+                                  publication: Optional[rtc.RemoteTrackPublication] = None):
+        """Analyze one video track in its own task; the vision workers share their budget fairly across tracks"""
+        track_key = f"{participant.identity}/{track.sid}"
+        logger.info(f"📹 Processing video from {track_key}")
+        
+        # The reader overwrites the mailbox at full rate; analysis always takes the freshest frame
+        mailbox = FrameMailbox()
+        pipeline = self.tracks[track_key] = TrackPipeline.create()
+        pipeline.mailbox = mailbox
+        
+        # Monitor on the low simulcast layer; keyframes switch to the high layer on demand
+        pipeline.simulcast = SimulcastController(publication)
+        pipeline.simulcast.monitor()
+        
+        # Optionally record every incoming frame for offline replay (replay_consultation.py)
+        recorder = None
+        if RECORDER_CONFIG["directory"]:
+            name = f"{self.consultation_id or 'session'}-{track_key}"
+            safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+            recorder = FrameRecorder(os.path.join(RECORDER_CONFIG["directory"], safe_name))
+            recorder.start()
+        
+        reader = asyncio.create_task(
+            read_track_into_mailbox(track, mailbox, recorder.record if recorder else None)
+        )
+        try:
+            while (frame := await mailbox.get()) is not None:
+                # Time from the frame arriving to the analyzer picking it up
+                PIPELINE_METRICS.observe(FRAME_RECEIVE, mailbox.last_staleness)
+                await self.process_video_frame(frame, track_key, time.monotonic() - mailbox.last_staleness)
+        finally:
+            reader.cancel()
+            self.vision_pool.remove_track(track_key)
+            if pipeline.quality_gate:
+                self.quality_totals.update(pipeline.quality_gate.stats())
+            self.tracks.pop(track_key, None)
+            logger.info(f"📬 Frame mailbox stats for {track_key}: {mailbox.stats()}")
+            logger.info(f"📡 Simulcast stats for {track_key}: {pipeline.simulcast.stats()}")
+            for stage in pipeline.pre_stages:
+                logger.info(f"🎬 {type(stage).__name__} stats for {track_key}: {stage.stats()}")
+            if recorder:
+                await asyncio.to_thread(recorder.close)
+                logger.info(f"🎞️ Recorded {track_key} to {recorder.base}: {recorder.stats()}")
+
+    def start_video_track(self, track: rtc.Track, participant: rtc.RemoteParticipant,
+                          publication: Optional[rtc.RemoteTrackPublication] = None):
+        """Spawn a processing task for a newly subscribed video track"""
+        task = asyncio.create_task(self.process_video_track(track, participant, publication))
+        self.track_tasks[track.sid] = task
+        task.add_done_callback(lambda _: self.track_tasks.pop(track.sid, None))
+
     async def handle_participant_connected(self, participant: rtc.RemoteParticipant):
         """Handle when a participant connects"""
         logger.info(f"👤 Participant connected: {participant.identity}")
         
+        # A rejoin after the final summary continues the consultation
+        self.consultation_finished = False
+        
         # Start avatar when first participant joins
         if not self.is_active:
             await self.start_avatar(participant.room)
+        
+        # Bring the newcomer's UI up to date
+        await self.send_inventory_snapshot()
 
     async def handle_participant_disconnected(self, participant: rtc.RemoteParticipant):
         """Handle when a participant disconnects"""
@@ -255,38 +548,110 @@ class EnhancedAnamAgent:
         
         # Generate final inventory summary
         if len(participant.room.remote_participants) == 0:
+            # Let in-flight analyses land before summarizing
+            await self.vision_pool.stop()
+            logger.info(f"👷 Vision pool stats: {self.vision_pool.stats()}")
+            logger.info(f"🛡️ Vision resilience stats: {vision_backend.stats()}")
+            logger.info(f"🚦 Rate limiter stats: {rate_limiter.stats()}")
+            logger.info(f"🗃️ Vision cache stats: {self.vision_cache.stats()}")
+            logger.info(f"🖼️ Frame encoder stats: {frame_encoder.stats()}")
+            self.vision_cache.save()
+            
+            # The full inventory goes out as a (chunked) binary snapshot; the text message stays within one packet
+            await self.send_inventory_snapshot(final=True)
             summary = self.generate_inventory_summary()
-            await self.send_consultation_message(f"Final inventory summary:\n{summary}")
+            message = f"Final inventory summary:\n{summary}"
+            if len(message.encode("utf-8")) > PROTOCOL_CONFIG["max_packet_bytes"]:
+                item_count = sum(len(items) for items in self.state.inventory.values())
+                where = ("your inventory panel" if PROTOCOL_CONFIG["enabled"]
+                         else "the consultation report")
+                message = (f"Final inventory summary: {item_count} items across {len(self.state.inventory)} rooms. "
+                           f"The full list is in {where}.")
+            await self.send_consultation_message(message)
+            logger.info(f"📦 Inventory protocol stats: {self.protocol.stats()}")
+            logger.info(f"📈 Pipeline stage latencies: {PIPELINE_METRICS.summary()}")
+            logger.info(f"⏱️ Event-loop lag: {loop_monitor.stats()}")
+            logger.info(f"🧮 Frame dedup stats: {self.deduplicator.stats()}")
+            logger.info(f"🔎 Frame quality stats: {self.quality_stats()}")
             
-            # Save inventory to file
-            self.save_inventory_to_file()
+            # Save inventory
+            await self.save_inventory()
+            self.consultation_finished = True
             await self.stop_avatar()
 
-    def save_inventory_to_file(self):
+    async def close(self):
+        """Tear down this consultation: stop track tasks, drain vision work, persist the cache, stop the avatar"""
+        for task in list(self.track_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self.track_tasks.values(), return_exceptions=True)
+        await self.vision_pool.stop()
+        self.vision_cache.save()
+        if self.journal:
+            # Joining the writer thread happens off the event loop
+            if self.consultation_finished:
+                # Ended cleanly: a later job must not "recover" this consultation
+                await asyncio.to_thread(self.journal.discard)
+            else:
+                # Shut down mid-consultation: leave a final compacted snapshot for recovery
+                try:
+                    await asyncio.to_thread(self.journal.close, self.state)
+                except JournalError as e:
+                    logger.error(f"❌ {e}; the final snapshot was not written")
+            logger.info(f"📓 Inventory journal stats: {self.journal.stats()}")
+            self.journal = None
+        await self.stop_avatar()
+
+    async def save_inventory(self):
+        """Close out the consultation in the inventory database (or a per-consultation JSON file without one)"""
+        if inventory_db and self.consultation_id:
+            await asyncio.wrap_future(
+                inventory_db.submit(inventory_db.end_session, self.consultation_id, self.state.current_room)
+            )
+            logger.info(f"💾 Inventory saved to {inventory_db.path} (session {self.consultation_id})")
+            return
+        
+        await asyncio.to_thread(self.save_inventory_to_file, f"inventory_{self.consultation_id or 'session'}.json")
+
+    def save_inventory_to_file(self, path: str = "inventory.json"):
         """Save inventory to JSON file"""
         try:
             inventory_data = {
                 "timestamp": time.time(),
-                "inventory": state.inventory,
-                "notes": state.consultation_notes,
-                "current_room": state.current_room
+                "inventory": self.state.inventory,
+                "notes": self.state.consultation_notes,
+                "current_room": self.state.current_room
             }
             
-            with open("inventory.json", "w") as f:
+            with open(path, "w") as f:
                 json.dump(inventory_data, f, indent=2)
             
-            logger.info("💾 Inventory saved to inventory.json")
+            logger.info(f"💾 Inventory saved to {path}")
         except Exception as e:
             logger.error(f"❌ Error saving inventory: {e}")
 
-# Global agent instance
-enhanced_agent = EnhancedAnamAgent()
+# Per-room agent instances, so one worker process can host many consultations
+sessions = SessionRegistry(lambda key: EnhancedAnamAgent(), cleanup=lambda agent: agent.close())
 
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for the enhanced LiveKit agent"""
     logger.info("🚀 Enhanced LiveKit Agent with Anam.ai Avatar + Vision Analysis starting...")
     
     room = ctx.room
+    key = session_key(ctx)
+    
+    # One metrics endpoint and event-loop monitor per worker process (no-ops once started)
+    await metrics_server.start()
+    loop_monitor.start()
+    
+    enhanced_agent = sessions.get_or_create(key)
+    
+    async def release_session():
+        await sessions.release(key)
+        # Last consultation in this worker: drain and close the shared HTTP pool (recreated on next use)
+        if not sessions:
+            await close_http_clients()
+    
+    ctx.add_shutdown_callback(release_session)
     
     # Set up room event handlers
     @room.on("participant_connected")
@@ -297,12 +662,27 @@ async def entrypoint(ctx: JobContext):
     def on_participant_disconnected(participant: rtc.RemoteParticipant):
         asyncio.create_task(enhanced_agent.handle_participant_disconnected(participant))
     
-    # Subscribe to remote tracks for video analysis
+    @room.on("data_received")
+    def on_data_received(packet: rtc.DataPacket):
+        if packet.topic == CAPTURE_TOPIC and packet.participant:
+            enhanced_agent.request_capture(packet.participant.identity)
+        elif packet.topic == RESYNC_TOPIC:
+            asyncio.create_task(enhanced_agent.send_inventory_snapshot())
+    
+    # Only video is analyzed, so never subscribe to (and decode) remote audio
+    await ctx.connect(auto_subscribe=AutoSubscribe.VIDEO_ONLY)
+    
+    # Rebuild state from the consultation's journal if a previous worker crashed mid-session
+    # (the room's name and sid are only known once connected)
+    enhanced_agent.open_consultation(await consultation_id(ctx), room.name)
+    
+    # Subscribe to remote tracks for video analysis; every video track gets its own task
     async for event in subscribe_remote_tracks(ctx):
+        publication = getattr(event, "publication", None)
         if event.kind == "video":
-            logger.info(f"📹 Processing video from {event.participant.identity}")
-            async for frame in event.track:
-                await enhanced_agent.process_video_frame(frame)
+            enhanced_agent.start_video_track(event.track, event.participant, publication)
+        elif publication is not None:
+            publication.set_subscribed(False)
     
     logger.info("✅ Enhanced agent event handlers registered")
     
@@ -312,7 +692,7 @@ async def entrypoint(ctx: JobContext):
             await asyncio.sleep(1)
     except KeyboardInterrupt:
         logger.info("🛑 Enhanced agent shutting down...")
-        await enhanced_agent.stop_avatar()
+        await sessions.release(key)
 
 if __name__ == "__main__":
     # Run the enhanced agent
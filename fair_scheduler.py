@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Fair scheduling of vision work across tracks and participants
+Each key (usually one video track) gets its own small bounded queue, and
+consumers take jobs in weighted round-robin order, so one busy camera cannot
+starve the others of the shared vision concurrency budget.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+
+class FairScheduler:
+    def __init__(self, per_key_capacity: int, overflow: str = "drop_oldest"):
+        self.per_key_capacity = per_key_capacity
+        self.overflow = overflow  # drop_oldest | reject
+        self.queues: "OrderedDict[str, Deque[Any]]" = OrderedDict()
+        self.weights: Dict[str, int] = {}
+        self.served: Dict[str, int] = {}
+        self._order: Deque[str] = deque()
+        self._credits = 0  # Jobs taken from the key at the head of the rotation this turn
+        self._ready = asyncio.Event()
+        self._size = 0
+
+    def set_weight(self, key: str, weight: int):
+        """Give a key more (or fewer) consecutive jobs per round-robin turn"""
+        self.weights[key] = max(1, weight)
+
+    def _queue_for(self, key: str) -> Deque[Any]:
+        queue = self.queues.get(key)
+        if queue is None:
+            queue = self.queues[key] = deque()
+            self.served.setdefault(key, 0)
+            self._order.append(key)
+        return queue
+
+    def put(self, key: str, item: Any) -> Optional[Any]:
+        """Queue an item for a key.
+
+        Returns the item that was displaced to make room (the oldest one under
+        "drop_oldest", or the new item itself under "reject"), or None.
+        """
+        queue = self._queue_for(key)
+        displaced = None
+        if len(queue) >= self.per_key_capacity:
+            if self.overflow != "drop_oldest":
+                return item
+            displaced = queue.popleft()
+            self._size -= 1
+
+        queue.append(item)
+        self._size += 1
+        self._ready.set()
+        return displaced
+
+    def get_nowait(self) -> Optional[Any]:
+        """Take the next item in weighted round-robin order, or None if all queues are empty"""
+        for _ in range(len(self._order) + 1):
+            if not self._order:
+                break
+            key = self._order[0]
+            queue = self.queues[key]
+            if queue and self._credits < self.weights.get(key, 1):
+                self._credits += 1
+                self._size -= 1
+                self.served[key] += 1
+                return queue.popleft()
+            self._order.rotate(-1)
+            self._credits = 0
+
+        self._ready.clear()
+        return None
+
+    async def get(self) -> Any:
+        """Wait for and take the next item"""
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                return item
+            await self._ready.wait()
+
+    def remove(self, key: str) -> int:
+        """Forget a key (e.g. its track ended), returning how many queued items were discarded"""
+        queue = self.queues.pop(key, None)
+        if queue is None:
+            return 0
+        if self._order and self._order[0] == key:
+            self._credits = 0
+        self._order.remove(key)
+        self.weights.pop(key, None)
+        self.served.pop(key, None)
+        self._size -= len(queue)
+        return len(queue)
+
+    def discard(self, key: str, item: Any) -> bool:
+        """Take one queued item back out (e.g. its consumer gave up on it)"""
+        queue = self.queues.get(key)
+        if queue is None or item not in queue:
+            return False
+        queue.remove(item)
+        self._size -= 1
+        return True
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queued and served counts per key"""
+        return {
+            key: {"queued": len(self.queues[key]) if key in self.queues else 0, "served": served}
+            for key, served in self.served.items()
+        }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for a LiveKit room and an Anam avatar session
+Just enough of rtc.Room (event handlers, remote participants, data channel)
+and anam.AvatarSession / AgentSession for the agents' room logic to run
+offline in load tests. The fake avatar keeps a 50 Hz "media" tick running
+while active and records how late each tick fires, which is what a real
+avatar's audio/video would suffer when the worker's event loop is overloaded.
+"""
+
+import time
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class FakeDataPacket:
+    data: bytes
+    topic: Optional[str] = None
+    participant: Any = None
+
+
+class FakeLocalParticipant:
+    def __init__(self, identity: str = "agent"):
+        self.identity = identity
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.topics: Dict[Optional[str], int] = defaultdict(int)
+
+    async def publish_data(self, payload, reliable: bool = True, topic: Optional[str] = None, **kwargs):
+        await asyncio.sleep(0)  # A real publish always yields to the loop
+        self.packets_sent += 1
+        self.bytes_sent += len(payload)
+        self.topics[topic] += 1
+
+
+class FakeRemoteParticipant:
+    def __init__(self, identity: str, room: "FakeRoom"):
+        self.identity = identity
+        self.room = room
+
+
+class FakeRoom:
+    """rtc.Room look-alike: room.on(event) handlers, remote participants and a local participant"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.local_participant = FakeLocalParticipant()
+        self.remote_participants: Dict[str, FakeRemoteParticipant] = {}
+        self.handlers: Dict[str, List[Callable]] = defaultdict(list)
+
+    def on(self, event: str, callback: Optional[Callable] = None):
+        if callback is not None:
+            self.handlers[event].append(callback)
+            return callback
+
+        def decorator(fn):
+            self.handlers[event].append(fn)
+            return fn
+        return decorator
+
+    def emit(self, event: str, *args):
+        for handler in list(self.handlers[event]):
+            handler(*args)
+
+    def connect_participant(self, identity: str) -> FakeRemoteParticipant:
+        participant = self.remote_participants[identity] = FakeRemoteParticipant(identity, self)
+        self.emit("participant_connected", participant)
+        return participant
+
+    def disconnect_participant(self, identity: str):
+        participant = self.remote_participants.pop(identity)
+        self.emit("participant_disconnected", participant)
+
+    def send_data(self, data: bytes, topic: Optional[str], participant: FakeRemoteParticipant):
+        """Deliver a packet from a remote participant to the agent"""
+        self.emit("data_received", FakeDataPacket(data, topic, participant))
+
+
+# Shared across all fake avatars so a load test can read lateness for every room
+AVATAR_TICK_LATENESS: List[float] = []
+
+
+class FakeAvatarSession:
+    """anam.AvatarSession look-alike with simulated connect latency and a 50 Hz media tick"""
+
+    connect_latency = 0.3
+    tick_interval = 0.02
+
+    def __init__(self, persona_config=None, api_key: Optional[str] = None, **kwargs):
+        self.persona_config = persona_config
+        self.ticker: Optional[asyncio.Task] = None
+
+    async def start(self, session, room=None):
+        await asyncio.sleep(self.connect_latency)
+        self.ticker = asyncio.create_task(self._tick())
+
+    async def _tick(self):
+        next_tick = time.monotonic() + self.tick_interval
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            AVATAR_TICK_LATENESS.append(max(0.0, time.monotonic() - next_tick))
+            next_tick += self.tick_interval
+
+    async def stop(self):
+        if self.ticker:
+            self.ticker.cancel()
+            self.ticker = None
+
+
+class FakeAgentSession:
+    async def start(self, *args, **kwargs):
+        await asyncio.sleep(0)
+
+    async def stop(self):
+        await asyncio.sleep(0)
+
+
+# Drop-in for the livekit.plugins.anam module inside agent modules
+fake_anam = SimpleNamespace(PersonaConfig=lambda **kwargs: kwargs, AvatarSession=FakeAvatarSession)
+
+
+def install_fakes(agent_module):
+    """Point an agent module's avatar/session classes at the fakes"""
+    agent_module.anam = fake_anam
+    agent_module.AgentSession = FakeAgentSession
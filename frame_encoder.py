@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Off-loop frame conversion and JPEG encoding
+Video frames are converted, downscaled to a configurable maximum dimension
+and JPEG-encoded on a thread pool (PIL releases the GIL for the heavy work),
+so the event loop never pays for full-resolution image processing.
+"""
+
+import asyncio
+import io
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Encoder Configuration
+FRAME_ENCODER_CONFIG = {
+    "workers": int(os.getenv("FRAME_ENCODER_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    "max_dimension": int(os.getenv("FRAME_MAX_DIMENSION", "768")),  # Longest side sent to the vision model
+    "jpeg_quality": int(os.getenv("FRAME_JPEG_QUALITY", "85")),
+}
+
+
+class _TimingStats:
+    """Timings recorded from the pool threads and read from the event loop"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            self.max = max(self.max, seconds)
+
+    def as_dict(self, prefix: str) -> Dict[str, float]:
+        with self.lock:
+            count, total, last, longest = self.count, self.total, self.last, self.max
+        return {
+            f"{prefix}_count": count,
+            f"{prefix}_last_ms": last * 1000,
+            f"{prefix}_avg_ms": (total / count * 1000) if count else 0.0,
+            f"{prefix}_max_ms": longest * 1000,
+        }
+
+
+class FrameEncoder:
+    def __init__(self, convert: Callable[[Any], Image.Image], workers: int = None,
+                 max_dimension: int = None, jpeg_quality: int = None):
+        self.convert = convert
+        self.max_dimension = max_dimension or FRAME_ENCODER_CONFIG["max_dimension"]
+        self.jpeg_quality = jpeg_quality or FRAME_ENCODER_CONFIG["jpeg_quality"]
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or FRAME_ENCODER_CONFIG["workers"], thread_name_prefix="frame-encoder"
+        )
+        self.convert_stats = _TimingStats()
+        self.encode_stats = _TimingStats()
+
+    def _convert_sync(self, frame: Any) -> Image.Image:
+        start = time.perf_counter()
+        img = self.convert(frame)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        # thumbnail() resizes in place and keeps the aspect ratio
+        if max(img.size) > self.max_dimension:
+            img.thumbnail((self.max_dimension, self.max_dimension), Image.BILINEAR)
+        self.convert_stats.record(time.perf_counter() - start)
+        return img
+
+    def _encode_sync(self, img: Image.Image) -> bytes:
+        start = time.perf_counter()
+        # A fresh buffer: getvalue() can hand over its bytes without a copy, which a reused one cannot
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=self.jpeg_quality)
+        data = buf.getvalue()
+        self.encode_stats.record(time.perf_counter() - start)
+        return data
+
+    async def to_image(self, frame: Any) -> Image.Image:
+        """Convert a video frame to a downscaled RGB image off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._convert_sync, frame)
+
+    async def encode(self, img: Image.Image) -> bytes:
+        """JPEG-encode an image off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._encode_sync, img)
+
+    def shutdown(self):
+        """Stop the encoder threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Per-frame conversion and encode timings"""
+        return {**self.convert_stats.as_dict("convert"), **self.encode_stats.as_dict("encode")}
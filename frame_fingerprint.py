@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Perceptual frame fingerprinting for the moving consultation agent
+Computes difference hashes (dHash) on a downscaled grayscale copy of each
+video frame so near-identical frames can be dropped before a paid vision call.
+"""
+
+import os
+import logging
+from collections import Counter, deque
+from typing import Deque, Dict, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Deduplication Configuration
+DEDUP_CONFIG = {
+    "hash_size": int(os.getenv("FRAME_HASH_SIZE", "8")),  # 8 -> 64-bit hash
+    "max_distance": int(os.getenv("FRAME_DEDUP_MAX_DISTANCE", "6")),  # Hamming bits still "the same view"
+    "history": int(os.getenv("FRAME_DEDUP_HISTORY", "32")),  # Recently analyzed hashes to compare against
+}
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """Compute a difference hash of an image as an integer of hash_size**2 bits"""
+    gray = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = gray.tobytes()
+    row_len = hash_size + 1
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * row_len
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+class FrameDeduplicator:
+    def __init__(self, hash_size: int = None, max_distance: int = None, history: int = None):
+        self.hash_size = hash_size or DEDUP_CONFIG["hash_size"]
+        self.max_distance = DEDUP_CONFIG["max_distance"] if max_distance is None else max_distance
+        self.recent: Deque[int] = deque(maxlen=history or DEDUP_CONFIG["history"])
+        self.pending: Counter = Counter()  # Hashes of frames queued or in flight, not yet analyzed
+        self.frames_seen = 0
+        self.frames_sent = 0
+        self.frames_cached = 0  # Served from the vision cache instead of a vision call
+        self.frames_skipped = 0
+
+    def is_duplicate(self, frame_hash: int) -> bool:
+        """Check whether a hash is within max_distance of a recently analyzed or in-flight frame"""
+        return any(hamming_distance(frame_hash, seen) <= self.max_distance
+                   for seen in (*self.recent, *self.pending))
+
+    def should_analyze(self, img: Image.Image, frame_hash: Optional[int] = None) -> bool:
+        """Fingerprint a frame (unless already hashed) and decide whether it is worth a vision call.
+
+        Nothing is recorded here: reserve() the hash once the frame is queued,
+        then commit() it when the analysis succeeds or release() it when the
+        frame is dropped or fails, so a view is only suppressed once it is paid for.
+        """
+        self.frames_seen += 1
+        if frame_hash is None:
+            frame_hash = dhash(img, self.hash_size)
+
+        if self.is_duplicate(frame_hash):
+            self.frames_skipped += 1
+            return False
+        return True
+
+    def reserve(self, frame_hash: int):
+        """The frame was queued for analysis; suppress copies of it while it is in flight"""
+        self.pending[frame_hash] += 1
+
+    def release(self, frame_hash: int):
+        """The frame was dropped or its analysis failed; the view may be sent again"""
+        if self.pending[frame_hash] <= 1:
+            self.pending.pop(frame_hash, None)
+        else:
+            self.pending[frame_hash] -= 1
+
+    def commit(self, frame_hash: int, cached: bool = False):
+        """The frame was analyzed (or served from the cache); treat the view as seen"""
+        self.release(frame_hash)
+        self.recent.append(frame_hash)
+        if cached:
+            self.frames_cached += 1
+        else:
+            self.frames_sent += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for skipped versus sent (and cache-served) frames"""
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_sent": self.frames_sent,
+            "frames_cached": self.frames_cached,
+            "frames_skipped": self.frames_skipped,
+            "frames_pending": sum(self.pending.values()),
+            "skip_ratio": self.frames_skipped / self.frames_seen if self.frames_seen else 0.0,
+        }
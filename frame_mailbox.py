@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Latest-frame-wins mailbox between a video track reader and frame analysis
+The reader overwrites a single slot at full camera rate; the analyzer always
+takes the freshest frame, so analysis never falls behind the live video.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class FrameMailbox:
+    def __init__(self):
+        self._frame: Any = None
+        self._frame_ts = 0.0
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.frames_received = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0  # Overwritten before the analyzer took them
+        self.last_staleness = 0.0
+        self.max_staleness = 0.0
+        self._total_staleness = 0.0
+
+    def put(self, frame: Any):
+        """Store a frame, replacing any frame the analyzer has not taken yet"""
+        if self._frame is not None:
+            self.frames_dropped += 1
+        self._frame = frame
+        self._frame_ts = time.monotonic()
+        self.frames_received += 1
+        self._ready.set()
+
+    async def get(self) -> Optional[Any]:
+        """Wait for and take the freshest frame; returns None once closed and empty"""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        frame = self._frame
+        self._frame = None
+
+        staleness = time.monotonic() - self._frame_ts
+        self.last_staleness = staleness
+        self.max_staleness = max(self.max_staleness, staleness)
+        self._total_staleness += staleness
+        self.frames_delivered += 1
+        return frame
+
+    def close(self):
+        """Signal that the track has ended"""
+        self._closed = True
+        self._ready.set()
+
+    def stats(self) -> Dict[str, float]:
+        """Dropped-frame and staleness metrics (staleness in milliseconds)"""
+        delivered = self.frames_delivered
+        return {
+            "frames_received": self.frames_received,
+            "frames_delivered": delivered,
+            "frames_dropped": self.frames_dropped,
+            "last_staleness_ms": self.last_staleness * 1000,
+            "max_staleness_ms": self.max_staleness * 1000,
+            "avg_staleness_ms": (self._total_staleness / delivered * 1000) if delivered else 0.0,
+        }
+
+
+async def read_track_into_mailbox(track, mailbox: FrameMailbox,
+                                  tap: Optional[Callable[[Any, float], None]] = None):
+    """Drain a video track at full rate into a mailbox, closing it when the track ends.
+
+    tap, if given, sees every incoming frame with its arrival time (e.g. a recorder).
+    """
+    try:
+        async for frame in track:
+            if tap:
+                tap(frame, time.monotonic())
+            mailbox.put(frame)
+    finally:
+        mailbox.close()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Local blur and exposure quality gate for video frames
+Rejects motion-blurred, dark, washed-out or shaky frames before they are
+encoded and sent to the vision model, using vectorized NumPy measures:
+Laplacian-variance sharpness, luminance histogram exposure, and frame-to-frame
+motion magnitude. When frames keep getting rejected it produces a lighting or
+slow-down hint that the agent can say without a vision call.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+from scene_detector import grayscale_array, mean_abs_diff
+
+# Quality Gate Configuration
+QUALITY_CONFIG = {
+    "enabled": os.getenv("QUALITY_GATE_ENABLED", "true").lower() == "true",
+    "size": int(os.getenv("QUALITY_SAMPLE_SIZE", "256")),  # Sharpness needs more detail than scene detection
+    "min_sharpness": float(os.getenv("QUALITY_MIN_SHARPNESS", "0.0015")),  # Laplacian variance on [0, 1] luminance
+    "dark_level": float(os.getenv("QUALITY_DARK_LEVEL", "0.12")),
+    "bright_level": float(os.getenv("QUALITY_BRIGHT_LEVEL", "0.95")),
+    "max_dark_fraction": float(os.getenv("QUALITY_MAX_DARK_FRACTION", "0.7")),
+    "max_bright_fraction": float(os.getenv("QUALITY_MAX_BRIGHT_FRACTION", "0.5")),
+    "max_motion": float(os.getenv("QUALITY_MAX_MOTION", "0.15")),  # Frame-to-frame mean absolute difference
+    "hint_after": int(os.getenv("QUALITY_HINT_AFTER", "30")),  # Consecutive rejections before hinting
+}
+
+BLURRY = "blurry"
+TOO_DARK = "too_dark"
+OVEREXPOSED = "overexposed"
+MOTION = "motion"
+
+QUALITY_HINTS = {
+    TOO_DARK: "It's a little dark for me to see clearly. Could you turn on a light or open the curtains?",
+    OVEREXPOSED: "There's a lot of glare right now. Could you angle the camera away from the window or bright lights?",
+    BLURRY: "The picture is a bit blurry. Please hold the camera steady for a moment so I can see everything clearly.",
+    MOTION: "Please move the camera a little more slowly so I can see everything clearly.",
+}
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """Variance of the 4-neighbour Laplacian, a cheap sharpness measure"""
+    if gray.shape[0] < 3 or gray.shape[1] < 3:
+        return 0.0
+    lap = (gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]
+           - 4.0 * gray[1:-1, 1:-1])
+    return float(lap.var())
+
+
+class FrameQualityGate:
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = {**QUALITY_CONFIG, **(config or {})}
+        self.previous: Optional[np.ndarray] = None
+        self.rejected = {BLURRY: 0, TOO_DARK: 0, OVEREXPOSED: 0, MOTION: 0}
+        self.accepted = 0
+        self.consecutive_rejections = 0
+        self.last_reason: Optional[str] = None
+
+    def evaluate(self, img: Image.Image) -> Optional[str]:
+        """Return the rejection reason for a frame, or None if it is usable"""
+        cfg = self.config
+        gray = grayscale_array(img, cfg["size"])
+        previous, self.previous = self.previous, gray
+
+        if float((gray < cfg["dark_level"]).mean()) > cfg["max_dark_fraction"]:
+            return TOO_DARK
+        if float((gray > cfg["bright_level"]).mean()) > cfg["max_bright_fraction"]:
+            return OVEREXPOSED
+        if previous is not None and mean_abs_diff(gray, previous) > cfg["max_motion"]:
+            return MOTION
+        if laplacian_variance(gray) < cfg["min_sharpness"]:
+            return BLURRY
+        return None
+
+    def should_analyze(self, img: Image.Image) -> bool:
+        """Pre-stage hook: reject unusable frames and count them by reason"""
+        reason = self.evaluate(img)
+        if reason is None:
+            self.accepted += 1
+            self.consecutive_rejections = 0
+            return True
+
+        self.rejected[reason] += 1
+        self.consecutive_rejections += 1
+        self.last_reason = reason
+        return False
+
+    def pending_hint(self) -> Optional[str]:
+        """A local hint for the user once frames have been rejected for a while"""
+        if self.consecutive_rejections < self.config["hint_after"] or not self.last_reason:
+            return None
+        self.consecutive_rejections = 0
+        return QUALITY_HINTS[self.last_reason]
+
+    def stats(self) -> Dict[str, int]:
+        """Accepted frames and rejected frame counts by reason"""
+        return {"accepted": self.accepted, **{f"rejected_{k}": v for k, v in self.rejected.items()}}
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped on-disk store for recorded consultation video
+Each recorded track is two append-only files: <name>.frames holds the raw
+frame buffers exactly as LiveKit delivered them (usually I420, 1.5 bytes per
+pixel, no re-encoding), and <name>.index holds one fixed-size record per
+frame (timestamp, size, buffer type, offset, length). Recording happens on a
+background thread so the event loop never waits on disk. Replays mmap the
+data file and hand out zero-copy slices, so long recordings need no more
+memory than the frames currently in use. A crash loses at most the frames
+that were still queued.
+"""
+
+import os
+import mmap
+import queue
+import struct
+import logging
+import threading
+from typing import Any, Iterator, Optional, Tuple
+
+from livekit import rtc
+
+logger = logging.getLogger(__name__)
+
+# Recorder Configuration
+RECORDER_CONFIG = {
+    "directory": os.getenv("FRAME_RECORD_DIR"),  # Unset disables recording
+    "max_fps": float(os.getenv("FRAME_RECORD_MAX_FPS", "5")),  # 0 records every frame (720p I420 at 30 fps is ~2.5 GB/min)
+    "queue_frames": int(os.getenv("FRAME_RECORD_QUEUE_FRAMES", "64")),  # Frames buffered for the writer
+}
+
+MAGIC = b"DAVEFRM1"
+INDEX_RECORD = struct.Struct("<dIIIQI")  # timestamp, width, height, buffer type, offset, length
+
+_STOP = object()
+
+
+def store_paths(base: str) -> Tuple[str, str]:
+    """(data, index) file paths for a store"""
+    return f"{base}.frames", f"{base}.index"
+
+
+class FrameRecorder:
+    """Appends video frames and their timestamps to a frame store"""
+
+    def __init__(self, base: str, max_fps: float = None, queue_frames: int = None):
+        self.base = base
+        self.data_path, self.index_path = store_paths(base)
+        max_fps = RECORDER_CONFIG["max_fps"] if max_fps is None else max_fps
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_frames or RECORDER_CONFIG["queue_frames"])
+        self.thread: Optional[threading.Thread] = None
+        self.start_ts: Optional[float] = None
+        self.last_ts = float("-inf")
+        self.frames_recorded = 0
+        self.frames_skipped = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+
+    def start(self):
+        if self.thread:
+            return
+        os.makedirs(os.path.dirname(self.base) or ".", exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name=f"recorder-{os.path.basename(self.base)}", daemon=True)
+        self.thread.start()
+
+    def record(self, frame: Any, timestamp: float):
+        """Queue one frame (monotonic timestamp); drops it rather than block when the writer falls behind"""
+        if self.start_ts is None:
+            self.start_ts = timestamp
+        if timestamp - self.last_ts < self.min_interval:
+            self.frames_skipped += 1
+            return
+        # Check for room before copying the buffer, so dropped frames cost nothing on the event loop
+        if self.queue.full():
+            self.frames_dropped += 1
+            return
+        self.last_ts = timestamp
+        self.queue.put_nowait((timestamp - self.start_ts, frame.width, frame.height, int(frame.type),
+                               bytes(frame.data)))
+
+    def _run(self):
+        with open(self.data_path, "ab") as data, open(self.index_path, "ab") as index:
+            if index.tell() == 0:
+                index.write(MAGIC)
+            offset = data.tell()
+            while (item := self.queue.get()) is not _STOP:
+                timestamp, width, height, buffer_type, payload = item
+                data.write(payload)
+                index.write(INDEX_RECORD.pack(timestamp, width, height, buffer_type, offset, len(payload)))
+                offset += len(payload)
+                self.frames_recorded += 1
+                self.bytes_written += len(payload)
+                if self.queue.empty():
+                    data.flush()
+                    index.flush()
+
+    def close(self, timeout: float = 10.0):
+        """Flush queued frames and stop the writer (blocking; call off the event loop)"""
+        if not self.thread:
+            return
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def stats(self):
+        return {
+            "recorded": self.frames_recorded,
+            "skipped": self.frames_skipped,
+            "dropped": self.frames_dropped,
+            "megabytes": self.bytes_written / 2**20,
+        }
+
+
+class FrameStoreReader:
+    """Random access to a recorded track; frames are zero-copy views into the mmapped data file"""
+
+    def __init__(self, base: str):
+        self.base = base
+        self.data_path, self.index_path = store_paths(base)
+        with open(self.index_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.index_path} is not a frame store index")
+            raw = f.read()
+        # Ignore a torn final record from an interrupted recording
+        usable = len(raw) - len(raw) % INDEX_RECORD.size
+        self.index = [record for record in INDEX_RECORD.iter_unpack(raw[:usable])]
+
+        self._file = open(self.data_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        # Frames whose bytes never reached the data file are not replayable
+        while self.index and self.index[-1][4] + self.index[-1][5] > size:
+            self.index.pop()
+        self._view = memoryview(self._mmap) if self._mmap else None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def duration(self) -> float:
+        return self.index[-1][0] if self.index else 0.0
+
+    def timestamp(self, i: int) -> float:
+        return self.index[i][0]
+
+    def frame(self, i: int) -> rtc.VideoFrame:
+        _, width, height, buffer_type, offset, length = self.index[i]
+        return rtc.VideoFrame(width, height, rtc.VideoBufferType(buffer_type), self._view[offset:offset + length])
+
+    def __iter__(self) -> Iterator[Tuple[float, rtc.VideoFrame]]:
+        for i in range(len(self)):
+            yield self.timestamp(i), self.frame(i)
+
+    def close(self):
+        try:
+            if self._view is not None:
+                self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # Frames handed out earlier still reference the map; it is unmapped once they are collected
+            logger.debug(f"Frame store {self.base} still in use at close")
+        self._view = None
+        self._mmap = None
+        self._file.close()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Process-wide pooled async HTTP clients
+Every room in a worker shares one aiohttp session (Anam, LiveKit and
+stand-in APIs) and one httpx client (the OpenAI SDK's transport), created
+lazily on first use. Keep-alive pools with per-host limits, HTTP/2 for httpx
+when the h2 package is installed, and aiohttp's DNS cache mean a steady-state
+request reuses a warm TLS connection instead of paying for DNS and a
+handshake each time. close_http_clients() shuts both down gracefully.
+"""
+
+import os
+import asyncio
+import logging
+import importlib.util
+from typing import Any, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# HTTP Pool Configuration
+HTTP_POOL_CONFIG = {
+    "max_connections": int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100")),
+    "max_per_host": int(os.getenv("HTTP_POOL_MAX_PER_HOST", "20")),
+    "keepalive_seconds": float(os.getenv("HTTP_POOL_KEEPALIVE_SECONDS", "60")),
+    "dns_cache_seconds": int(os.getenv("HTTP_POOL_DNS_CACHE_SECONDS", "300")),
+    "connect_timeout": float(os.getenv("HTTP_POOL_CONNECT_TIMEOUT", "5")),
+    "timeout": float(os.getenv("HTTP_POOL_TIMEOUT", "60")),  # Whole-request default; callers may override
+    "http2": os.getenv("HTTP_POOL_HTTP2", "true").lower() == "true",
+}
+
+_aiohttp_session: Optional[aiohttp.ClientSession] = None
+_aiohttp_loop: Optional[asyncio.AbstractEventLoop] = None
+_httpx_client: Optional[Any] = None
+
+
+def http2_available() -> bool:
+    return HTTP_POOL_CONFIG["http2"] and importlib.util.find_spec("h2") is not None
+
+
+def _close_stale_session(session: Optional[aiohttp.ClientSession], loop: Optional[asyncio.AbstractEventLoop]):
+    """Close a session left behind by another event loop; its connections can only be closed on that loop"""
+    if session is None or session.closed:
+        return
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        logger.info("🔌 Closing the shared HTTP session of a previous event loop")
+    else:
+        logger.warning("⚠️ Shared HTTP session outlived its event loop; call close_http_clients() before the loop ends")
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """The shared aiohttp session for the running event loop (call from inside the loop)"""
+    global _aiohttp_session, _aiohttp_loop
+    loop = asyncio.get_running_loop()
+    if _aiohttp_session is None or _aiohttp_session.closed or _aiohttp_loop is not loop:
+        if _aiohttp_loop is not loop:
+            _close_stale_session(_aiohttp_session, _aiohttp_loop)
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_CONFIG["max_connections"],
+            limit_per_host=HTTP_POOL_CONFIG["max_per_host"],
+            keepalive_timeout=HTTP_POOL_CONFIG["keepalive_seconds"],
+            ttl_dns_cache=HTTP_POOL_CONFIG["dns_cache_seconds"],
+            use_dns_cache=True,
+        )
+        timeout = aiohttp.ClientTimeout(total=HTTP_POOL_CONFIG["timeout"],
+                                        sock_connect=HTTP_POOL_CONFIG["connect_timeout"])
+        _aiohttp_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _aiohttp_loop = loop
+        logger.info(f"🔌 Shared HTTP session created (limit {HTTP_POOL_CONFIG['max_connections']}, "
+                    f"{HTTP_POOL_CONFIG['max_per_host']} per host)")
+    return _aiohttp_session
+
+
+def get_httpx_client():
+    """The shared httpx.AsyncClient, e.g. for AsyncOpenAI(http_client=...)"""
+    global _httpx_client
+    if _httpx_client is None or _httpx_client.is_closed:
+        import httpx
+
+        _httpx_client = httpx.AsyncClient(
+            http2=http2_available(),
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_CONFIG["max_connections"],
+                max_keepalive_connections=HTTP_POOL_CONFIG["max_per_host"],
+                keepalive_expiry=HTTP_POOL_CONFIG["keepalive_seconds"],
+            ),
+            timeout=httpx.Timeout(HTTP_POOL_CONFIG["timeout"], connect=HTTP_POOL_CONFIG["connect_timeout"]),
+        )
+        logger.info(f"🔌 Shared httpx client created (HTTP/2 {'on' if http2_available() else 'off'})")
+    return _httpx_client
+
+
+async def close_http_clients():
+    """Close the shared clients, letting in-flight requests finish; they are recreated on next use"""
+    global _aiohttp_session, _aiohttp_loop, _httpx_client
+    if _aiohttp_session is not None and not _aiohttp_session.closed:
+        await _aiohttp_session.close()
+    if _httpx_client is not None and not _httpx_client.is_closed:
+        await _httpx_client.aclose()
+    _aiohttp_session = _aiohttp_loop = _httpx_client = None
+
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+SQLite inventory database for moving consultations
+One embedded database holds every consultation's sessions, rooms, items,
+notes and captured frames, with indexes on session, room, fragile/size flags
+and timestamps, so reports and admin queries are indexed lookups instead of
+scans over overwritten inventory.json files.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Database Configuration
+INVENTORY_DB_CONFIG = {
+    "enabled": os.getenv("INVENTORY_DB_ENABLED", "true").lower() == "true",
+    "path": os.getenv("INVENTORY_DB_PATH", "inventory.db"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    room_name TEXT,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    current_room TEXT
+);
+CREATE TABLE IF NOT EXISTS rooms (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    name TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (session_id, name)
+);
+CREATE TABLE IF NOT EXISTS items (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    room TEXT NOT NULL,
+    name TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    size TEXT,
+    fragile INTEGER NOT NULL DEFAULT 0,
+    confidence REAL,
+    sightings INTEGER,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (session_id, room, name)
+);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    room TEXT,
+    frame_hash TEXT,
+    user_capture INTEGER NOT NULL DEFAULT 0,
+    image BLOB,
+    captured_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_room_name ON sessions(room_name);
+CREATE INDEX IF NOT EXISTS idx_items_fragile ON items(fragile, session_id);
+CREATE INDEX IF NOT EXISTS idx_items_size ON items(size, session_id);
+CREATE INDEX IF NOT EXISTS idx_items_updated ON items(updated_at);
+CREATE INDEX IF NOT EXISTS idx_notes_session ON notes(session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_frames_session ON frames(session_id, room, captured_at);
+"""
+
+
+class InventoryDatabase:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or INVENTORY_DB_CONFIG["path"]
+        # Writes run on a single writer thread and reads may come from any thread, so share one connection behind a lock
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inventory-db")
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    # Writes
+
+    def submit(self, fn: Callable, *args):
+        """Run a write on the database's writer thread without waiting for it"""
+        future = self.writer.submit(fn, *args)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception():
+            logger.error(f"❌ Inventory database write failed: {future.exception()}")
+
+    def start_session(self, session_id: str, room_name: str):
+        """Create a session row (a reconnect to the same consultation reopens it)"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO sessions (id, room_name, started_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET ended_at = NULL",
+                (session_id, room_name, time.time()),
+            )
+
+    def apply_deltas(self, session_id: str, deltas: List, current_room: Optional[str] = None):
+        """Upsert/delete items for a batch of inventory deltas"""
+        now = time.time()
+        with self.lock, self.conn:
+            for delta in deltas:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO rooms (session_id, name, first_seen) VALUES (?, ?, ?)",
+                    (session_id, delta.room, now),
+                )
+                if delta.op == "removed":
+                    self.conn.execute(
+                        "DELETE FROM items WHERE session_id = ? AND room = ? AND name = ?",
+                        (session_id, delta.room, delta.name),
+                    )
+                    continue
+                d = delta.details
+                self.conn.execute(
+                    "INSERT INTO items (session_id, room, name, qty, size, fragile, confidence, sightings, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(session_id, room, name) DO UPDATE SET qty = excluded.qty, size = excluded.size, "
+                    "fragile = excluded.fragile, confidence = excluded.confidence, sightings = excluded.sightings, "
+                    "updated_at = excluded.updated_at",
+                    (session_id, delta.room, delta.name, d["qty"], d.get("size"), int(bool(d.get("fragile"))),
+                     d.get("confidence"), d.get("sightings"), now),
+                )
+            if current_room:
+                self.conn.execute("UPDATE sessions SET current_room = ? WHERE id = ?", (current_room, session_id))
+
+    def add_note(self, session_id: str, text: str):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO notes (session_id, text, created_at) VALUES (?, ?, ?)", (session_id, text, time.time())
+            )
+
+    def record_frame(self, session_id: str, room: str, frame_hash: Optional[int],
+                     user_capture: bool = False, image: Optional[bytes] = None):
+        """Record an analyzed frame; image bytes are only kept for user-triggered captures"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO frames (session_id, room, frame_hash, user_capture, image, captured_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, room, f"{frame_hash:x}" if frame_hash is not None else None,
+                 int(user_capture), image, time.time()),
+            )
+
+    def end_session(self, session_id: str, current_room: Optional[str] = None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE sessions SET ended_at = ?, current_room = COALESCE(?, current_room) WHERE id = ?",
+                (time.time(), current_room, session_id),
+            )
+
+    # Reads
+
+    def latest_session_id(self) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM sessions ORDER BY started_at DESC LIMIT 1").fetchone()
+        return row["id"] if row else None
+
+    def list_sessions(self, since: Optional[float] = None, limit: int = 100) -> List[Dict]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM sessions WHERE started_at >= ? ORDER BY started_at DESC LIMIT ?",
+                (since or 0, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def fragile_items(self, session_id: Optional[str] = None) -> List[Dict]:
+        """Fragile items for one session, or across all sessions"""
+        query = "SELECT * FROM items WHERE fragile = 1"
+        params = ()
+        if session_id:
+            query += " AND session_id = ?"
+            params = (session_id,)
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+    def load_session(self, session_id: Optional[str] = None) -> Optional[Dict]:
+        """Inventory data for a session (latest by default) in the inventory.json layout"""
+        session_id = session_id or self.latest_session_id()
+        if not session_id:
+            return None
+
+        with self.lock:
+            session = self.conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if not session:
+                return None
+            items = self.conn.execute(
+                "SELECT room, name, qty, size, fragile, confidence, sightings FROM items "
+                "WHERE session_id = ? ORDER BY room, name",
+                (session_id,),
+            ).fetchall()
+            notes = self.conn.execute(
+                "SELECT text FROM notes WHERE session_id = ? ORDER BY created_at", (session_id,)
+            ).fetchall()
+
+        inventory: Dict[str, Dict[str, Dict]] = {}
+        for row in items:
+            inventory.setdefault(row["room"], {})[row["name"]] = {
+                "qty": row["qty"],
+                "size": row["size"],
+                "fragile": bool(row["fragile"]),
+                "confidence": row["confidence"],
+                "sightings": row["sightings"],
+            }
+
+        return {
+            "session_id": session_id,
+            "timestamp": session["ended_at"] or session["started_at"],
+            "inventory": inventory,
+            "notes": [row["text"] for row in notes],
+            "current_room": session["current_room"],
+        }
+
+    def close(self):
+        self.writer.shutdown(wait=True)
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Append-only inventory journal with crash recovery
+Every inventory delta, note and room change is appended to a per-session
+JSONL journal by a background writer thread that group-commits (one write
+and one fsync per batch of records). Periodic snapshots compact the journal,
+and recover_session() rebuilds a consultation from snapshot + journal after
+a worker crash or restart. A consultation that ends cleanly deletes both.
+If the writer fails or falls too far behind, the next append/close raises
+JournalError once and the journal stops taking records, so what is on disk
+stays a consistent prefix of the consultation.
+"""
+
+import os
+import copy
+import json
+import time
+import queue
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Journal Configuration
+JOURNAL_CONFIG = {
+    "enabled": os.getenv("INVENTORY_JOURNAL_ENABLED", "true").lower() == "true",
+    "directory": os.getenv("INVENTORY_JOURNAL_DIR", "journals"),
+    "commit_interval": float(os.getenv("INVENTORY_JOURNAL_COMMIT_INTERVAL", "0.05")),  # Seconds to gather a group
+    "snapshot_every": int(os.getenv("INVENTORY_JOURNAL_SNAPSHOT_EVERY", "200")),  # Records between snapshots
+    "fsync": os.getenv("INVENTORY_JOURNAL_FSYNC", "true").lower() == "true",
+    "max_pending": int(os.getenv("INVENTORY_JOURNAL_MAX_PENDING", "10000")),  # Queued records before giving up
+}
+
+_STOP = object()
+
+
+class JournalError(RuntimeError):
+    """The journal writer failed or fell behind; no further records are journaled"""
+
+
+def _safe_id(session_id: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in session_id)
+
+
+def journal_paths(session_id: str, directory: Optional[str] = None):
+    """(journal, snapshot) file paths for a session"""
+    directory = directory or JOURNAL_CONFIG["directory"]
+    base = os.path.join(directory, _safe_id(session_id))
+    return f"{base}.journal.jsonl", f"{base}.snapshot.json"
+
+
+class InventoryJournal:
+    def __init__(self, session_id: str, directory: Optional[str] = None):
+        self.session_id = session_id
+        self.directory = directory or JOURNAL_CONFIG["directory"]
+        self.journal_path, self.snapshot_path = journal_paths(session_id, self.directory)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=JOURNAL_CONFIG["max_pending"])
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None  # Set by the writer thread (or a full queue)
+        self.stopped = False  # The error was surfaced to the caller; later records are dropped
+        self.records_since_snapshot = 0
+        self.records_written = 0
+        self.commits = 0
+        self.snapshots = 0
+
+    def start(self):
+        """Start the background writer thread"""
+        if self.thread:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name=f"journal-{self.session_id}", daemon=True)
+        self.thread.start()
+
+    def _put(self, item: Any):
+        """Queue an item for the writer, raising JournalError the first time the journal has failed"""
+        if self.stopped:
+            return
+        if self.error is None and self.queue.full():
+            self.error = JournalError(f"writer is {self.queue.qsize()} records behind")
+        if self.error is not None:
+            self.stopped = True
+            raise JournalError(f"Inventory journal {self.session_id} stopped: {self.error}") from self.error
+        self.queue.put_nowait(item)
+
+    def append(self, record_type: str, **fields):
+        """Queue one record; never blocks the caller on disk I/O"""
+        self._put({"t": record_type, "ts": time.time(), **fields})
+        self.records_since_snapshot += 1
+
+    def append_deltas(self, deltas: List):
+        for delta in deltas:
+            self.append("item", seq=delta.seq, op=delta.op, room=delta.room, name=delta.name, details=delta.details)
+
+    def snapshot(self, state):
+        """Queue a compacted snapshot of the session; the journal is truncated once it is on disk"""
+        payload = {
+            "inventory": copy.deepcopy(state.inventory),
+            "notes": list(state.consultation_notes),
+            "current_room": state.current_room,
+            "ts": time.time(),
+        }
+        self._put(("snapshot", payload))
+        self.records_since_snapshot = 0
+
+    def maybe_snapshot(self, state):
+        """Snapshot once enough records have accumulated"""
+        if self.records_since_snapshot >= JOURNAL_CONFIG["snapshot_every"]:
+            self.snapshot(state)
+
+    def _write_group(self, f, records: List[Dict]):
+        if not records:
+            return
+        f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        f.flush()
+        if JOURNAL_CONFIG["fsync"]:
+            os.fsync(f.fileno())
+        self.records_written += len(records)
+        self.commits += 1
+
+    def _write_snapshot(self, payload: Dict):
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+            f.flush()
+            if JOURNAL_CONFIG["fsync"]:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self.snapshots += 1
+
+    def _run(self):
+        f = open(self.journal_path, "a")
+        try:
+            while True:
+                item = self.queue.get()
+                # Group commit: gather whatever else arrives within the commit interval
+                batch = [item]
+                deadline = time.monotonic() + JOURNAL_CONFIG["commit_interval"]
+                while batch[-1] is not _STOP:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+
+                records: List[Dict] = []
+                for entry in batch:
+                    if entry is _STOP:
+                        self._write_group(f, records)
+                        return
+                    if isinstance(entry, tuple):
+                        # Everything queued before the snapshot is already in it
+                        self._write_snapshot(entry[1])
+                        records = []
+                        f.close()
+                        f = open(self.journal_path, "w")
+                    else:
+                        records.append(entry)
+                self._write_group(f, records)
+        except Exception as e:
+            logger.error(f"❌ Inventory journal writer error: {e}")
+            self.error = e
+        finally:
+            f.close()
+
+    def _stop_writer(self, timeout: float):
+        if self.thread.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+                self.thread.join(timeout)
+            except queue.Full:
+                logger.warning(f"⚠️ Inventory journal {self.session_id} writer did not drain within {timeout:.0f}s")
+        self.thread = None
+
+    def close(self, state=None, timeout: float = 5.0):
+        """Optionally write a final snapshot, then flush and stop the writer (raises JournalError on a writer failure)"""
+        if not self.thread:
+            return
+        try:
+            if state is not None:
+                self.snapshot(state)
+        finally:
+            self._stop_writer(timeout)
+        if self.error is not None and not self.stopped:
+            self.stopped = True
+            raise JournalError(f"Inventory journal {self.session_id} stopped: {self.error}") from self.error
+
+    def discard(self, timeout: float = 5.0):
+        """Stop the writer and delete the journal and snapshot (the consultation ended cleanly, nothing to recover)"""
+        if self.thread:
+            self._stop_writer(timeout)
+        for path in (self.journal_path, self.snapshot_path, f"{self.snapshot_path}.tmp"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "records_written": self.records_written,
+            "commits": self.commits,
+            "snapshots": self.snapshots,
+            "pending": self.queue.qsize(),
+            "stopped": self.stopped or self.error is not None,
+        }
+
+
+def recover_session(session_id: str, directory: Optional[str] = None) -> Optional[Dict]:
+    """Rebuild a session's inventory, notes and current room from snapshot + journal.
+
+    Returns None when there is nothing to recover.
+    """
+    journal_path, snapshot_path = journal_paths(session_id, directory)
+    if not os.path.exists(snapshot_path) and not os.path.exists(journal_path):
+        return None
+
+    state = {"inventory": {}, "notes": [], "current_room": "unknown"}
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r") as f:
+            snapshot = json.load(f)
+        state.update(inventory=snapshot["inventory"], notes=snapshot["notes"], current_room=snapshot["current_room"])
+
+    replayed = 0
+    if os.path.exists(journal_path):
+        with open(journal_path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn final write from the crash
+                replayed += 1
+                if record["t"] == "item":
+                    room_items = state["inventory"].setdefault(record["room"], {})
+                    if record["op"] == "removed":
+                        room_items.pop(record["name"], None)
+                    else:
+                        room_items[record["name"]] = record["details"]
+                elif record["t"] == "note":
+                    state["notes"].append(record["text"])
+                elif record["t"] == "room":
+                    state["current_room"] = record["room"]
+
+    logger.info(f"♻️ Recovered session {session_id}: {len(state['inventory'])} rooms, {replayed} journal records replayed")
+    return state
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Compact binary inventory protocol for the LiveKit data channel
+Inventory changes are sent to the meeting UI as small, versioned msgpack
+messages on their own topic instead of re-sending markdown summaries. Every
+message carries a sequence number; a UI that sees a gap (or joins late)
+publishes on the resync topic and gets a full snapshot. Messages larger
+than one reliable data packet are split into chunks and reassembled by
+ChunkAssembler.
+
+The meeting UI has no msgpack decoder for these topics yet, so the protocol
+is off by default (INVENTORY_PROTOCOL_ENABLED) and the UI keeps getting the
+plain-text summary until a consumer ships.
+
+Message layout (msgpack maps, short keys to keep packets tiny):
+    {"v": 1, "t": "delta", "s": seq, "ops": [[op, room, name, details], ...]}
+        op is "a" (added), "u" (updated) or "r" (removed, details nil);
+        details is {"q": qty, "z": size, "f": fragile, "c": confidence}
+    {"v": 1, "t": "room", "s": seq, "room": room}
+    {"v": 1, "t": "snapshot", "s": seq, "room": current_room, "inv": {room: {name: details}}, "final": bool}
+    {"v": 1, "t": "chunk", "id": message_id, "i": index, "n": count, "p": bytes}
+"""
+
+import os
+import itertools
+import logging
+from typing import Dict, List, Optional
+
+import msgpack
+
+from inventory_store import ADDED, REMOVED, UPDATED
+
+logger = logging.getLogger(__name__)
+
+# Protocol Configuration
+PROTOCOL_CONFIG = {
+    "enabled": os.getenv("INVENTORY_PROTOCOL_ENABLED", "false").lower() == "true",  # No UI consumer yet
+    "max_packet_bytes": int(os.getenv("INVENTORY_PROTOCOL_MAX_PACKET", "14000")),  # Below the ~15KiB reliable limit
+}
+
+PROTOCOL_VERSION = 1
+
+# Data channel topics: agent -> UI updates, and UI -> agent snapshot requests
+INVENTORY_TOPIC = "dave.inventory"
+RESYNC_TOPIC = "dave.inventory.resync"
+
+OP_CODES = {ADDED: "a", UPDATED: "u", REMOVED: "r"}
+
+# Room for the chunk envelope around each payload slice
+_CHUNK_OVERHEAD = 64
+
+
+def pack(message: Dict) -> bytes:
+    return msgpack.packb(message, use_bin_type=True)
+
+
+def unpack(data: bytes) -> Dict:
+    return msgpack.unpackb(data, raw=False)
+
+
+def compact_details(details: Optional[Dict]) -> Optional[Dict]:
+    """Only the fields the UI shows, under single-letter keys"""
+    if details is None:
+        return None
+    return {
+        "q": details.get("qty", 1),
+        "z": details.get("size"),
+        "f": bool(details.get("fragile")),
+        "c": details.get("confidence"),
+    }
+
+
+def expand_details(compact: Optional[Dict]) -> Optional[Dict]:
+    if compact is None:
+        return None
+    return {"qty": compact["q"], "size": compact["z"], "fragile": compact["f"], "confidence": compact["c"]}
+
+
+class InventoryProtocol:
+    """Encodes one consultation's inventory updates into data-channel packets"""
+
+    def __init__(self, max_packet_bytes: int = None):
+        self.max_packet_bytes = max_packet_bytes or PROTOCOL_CONFIG["max_packet_bytes"]
+        self.seq = 0
+        self._message_ids = itertools.count(1)
+        self.messages_sent = 0
+        self.chunks_sent = 0
+        self.bytes_sent = 0
+
+    def _packets(self, message_type: str, **fields) -> List[bytes]:
+        self.seq += 1
+        data = pack({"v": PROTOCOL_VERSION, "t": message_type, "s": self.seq, **fields})
+        packets = self.chunk(data)
+        self.messages_sent += 1
+        self.bytes_sent += sum(len(p) for p in packets)
+        return packets
+
+    def chunk(self, data: bytes) -> List[bytes]:
+        """Split an encoded message into chunk packets if it does not fit in one"""
+        if len(data) <= self.max_packet_bytes:
+            return [data]
+
+        size = self.max_packet_bytes - _CHUNK_OVERHEAD
+        count = (len(data) + size - 1) // size
+        message_id = next(self._message_ids)
+        self.chunks_sent += count
+        return [
+            pack({"v": PROTOCOL_VERSION, "t": "chunk", "id": message_id, "i": i, "n": count,
+                  "p": data[i * size:(i + 1) * size]})
+            for i in range(count)
+        ]
+
+    def deltas(self, deltas: List) -> List[bytes]:
+        """Packets for a batch of InventoryDelta changes (empty when nothing changed)"""
+        if not deltas:
+            return []
+        ops = [[OP_CODES[d.op], d.room, d.name, compact_details(d.details)] for d in deltas]
+        return self._packets("delta", ops=ops)
+
+    def room_changed(self, room: str) -> List[bytes]:
+        return self._packets("room", room=room)
+
+    def snapshot(self, inventory: Dict[str, Dict[str, Dict]], current_room: str, final: bool = False) -> List[bytes]:
+        """Packets for the full inventory, sent on resync requests and as the final summary"""
+        compact = {
+            room: {name: compact_details(details) for name, details in items.items()}
+            for room, items in inventory.items()
+        }
+        return self._packets("snapshot", room=current_room, inv=compact, final=final)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "seq": self.seq,
+            "messages": self.messages_sent,
+            "chunks": self.chunks_sent,
+            "bytes": self.bytes_sent,
+        }
+
+
+class ChunkAssembler:
+    """Receiver side: decode packets, reassembling chunked messages"""
+
+    def __init__(self, max_pending: int = 16):
+        self.max_pending = max_pending
+        self.pending: Dict[int, Dict[int, bytes]] = {}
+
+    def feed(self, packet: bytes) -> Optional[Dict]:
+        """Decode one packet; returns a complete message, or None while chunks are outstanding"""
+        message = unpack(packet)
+        if message.get("v") != PROTOCOL_VERSION:
+            logger.warning(f"⚠️ Ignoring inventory message with unsupported version {message.get('v')}")
+            return None
+        if message["t"] != "chunk":
+            return message
+
+        parts = self.pending.setdefault(message["id"], {})
+        parts[message["i"]] = message["p"]
+        if len(parts) < message["n"]:
+            # Drop the oldest incomplete message rather than growing without bound
+            while len(self.pending) > self.max_pending:
+                self.pending.pop(next(iter(self.pending)))
+            return None
+
+        del self.pending[message["id"]]
+        return unpack(b"".join(parts[i] for i in range(message["n"])))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Incremental inventory store with cross-frame observation fusion
+The same sofa seen in 40 frames is one sofa: each item's quantity is the
+maximum seen over a sliding window of its recent sightings, and its
+confidence is the share of the room's analyzed frames it appeared in.
+Updates are O(1) amortized per detection, the item table stays compact, and
+every change is recorded as a sequenced delta so consumers only process what
+changed. Bookkeeping-only changes (sightings, small confidence moves) are
+marked persist-only: they go to the journal and database but not to the UI.
+"""
+
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Inventory Fusion Configuration
+INVENTORY_CONFIG = {
+    "window": int(os.getenv("INVENTORY_FUSION_WINDOW", "8")),  # Recent sightings per item used for max-qty
+    "min_sightings": int(os.getenv("INVENTORY_MIN_SIGHTINGS", "1")),  # Sightings before an item is listed
+    "max_notes": int(os.getenv("INVENTORY_MAX_NOTES", "200")),
+    "confidence_step": float(os.getenv("INVENTORY_CONFIDENCE_STEP", "0.1")),  # Confidence moves the UI is told about
+}
+
+ADDED = "added"
+UPDATED = "updated"
+REMOVED = "removed"
+
+
+@dataclass
+class InventoryDelta:
+    seq: int
+    op: str  # added | updated | removed
+    room: str
+    name: str
+    details: Optional[Dict] = None
+    visible: bool = True  # False for persist-only bookkeeping the UI does not need
+
+
+@dataclass
+class _ItemTrack:
+    """Sliding-window max over an item's recent quantities (monotonic deque)"""
+    window: int
+    sightings: int = 0
+    recent: Deque[Tuple[int, int]] = field(default_factory=deque)  # (sighting index, qty), qty decreasing
+
+    def observe(self, qty: int) -> int:
+        index = self.sightings
+        self.sightings += 1
+        while self.recent and self.recent[-1][1] <= qty:
+            self.recent.pop()
+        self.recent.append((index, qty))
+        if self.recent[0][0] <= index - self.window:
+            self.recent.popleft()
+        return self.recent[0][1]
+
+
+class InventoryStore:
+    def __init__(self, inventory: Dict[str, Dict[str, Dict]], window: int = None, min_sightings: int = None,
+                 canonicalize: Optional[Callable[[str], str]] = None):
+        self.inventory = inventory  # room -> item -> details, updated in place
+        self.canonicalize = canonicalize or (lambda raw: raw.lower().strip())
+        self.window = window or INVENTORY_CONFIG["window"]
+        self.min_sightings = min_sightings or INVENTORY_CONFIG["min_sightings"]
+        self.confidence_step = INVENTORY_CONFIG["confidence_step"]
+        self.tracks: Dict[Tuple[str, str], _ItemTrack] = {}
+        self.room_frames: Dict[str, int] = {}
+        self.seq = 0
+        self._pending: Dict[Tuple[str, str], InventoryDelta] = {}
+
+        # Seed fusion state from an existing (e.g. recovered) inventory
+        for room, items in inventory.items():
+            self.room_frames[room] = max((d.get("sightings", 1) for d in items.values()), default=0)
+            for name, details in items.items():
+                track = self.tracks[(room, name)] = _ItemTrack(self.window)
+                track.observe(int(details.get("qty", 1)))
+                track.sightings = details.get("sightings", 1)
+
+    def _record(self, op: str, room: str, name: str, details: Optional[Dict], visible: bool = True):
+        self.seq += 1
+        key = (room, name)
+        previous = self._pending.get(key)
+        # An item added and then updated before anyone looked is still just "added"
+        if previous and previous.op == ADDED and op == UPDATED:
+            op = ADDED
+        # A coalesced change is visible if any part of it was
+        visible = visible or op != UPDATED or bool(previous and previous.visible)
+        self._pending[key] = InventoryDelta(self.seq, op, room, name, dict(details) if details else None, visible)
+
+    def _confidence_bucket(self, confidence: float) -> int:
+        return int(confidence / self.confidence_step + 1e-9) if self.confidence_step > 0 else 0
+
+    def observe(self, room: str, items: List[Dict]):
+        """Fuse one analyzed frame's detections for a room into the inventory"""
+        frames = self.room_frames[room] = self.room_frames.get(room, 0) + 1
+        room_items = self.inventory.setdefault(room, {})
+
+        # Collapse repeats within the same frame before fusing across frames
+        seen: Dict[str, Dict] = {}
+        for item in items:
+            name = self.canonicalize(item.get("name", "item"))
+            qty = int(item.get("qty", 1))
+            if name in seen:
+                seen[name]["qty"] += qty
+            else:
+                seen[name] = {"qty": qty, "size": item.get("size", "medium"), "fragile": item.get("fragile", False)}
+
+        for name, observed in seen.items():
+            track = self.tracks.get((room, name))
+            if track is None:
+                track = self.tracks[(room, name)] = _ItemTrack(self.window)
+            qty = track.observe(observed["qty"])
+            if track.sightings < self.min_sightings:
+                continue
+
+            confidence = round(min(1.0, track.sightings / frames), 2)
+            details = room_items.get(name)
+            if details is None:
+                details = room_items[name] = {**observed, "qty": qty}
+                details.update(sightings=track.sightings, confidence=confidence)
+                self._record(ADDED, room, name, details)
+                continue
+
+            fragile = bool(details.get("fragile")) or bool(observed["fragile"])
+            visible = details["qty"] != qty or details.get("fragile") != fragile
+            details["qty"] = qty
+            details["fragile"] = fragile
+            details["sightings"] = track.sightings
+            self._update_confidence(room, name, details, confidence, visible, persist=True)
+
+        # Items not in this frame lose confidence, so a one-off false detection fades instead of staying at 1.0
+        for name, details in room_items.items():
+            if name not in seen:
+                track = self.tracks.get((room, name))
+                if track is not None:
+                    self._update_confidence(room, name, details, round(min(1.0, track.sightings / frames), 2))
+
+    def _update_confidence(self, room: str, name: str, details: Dict, confidence: float,
+                           visible: bool = False, persist: bool = False):
+        """Store an item's confidence; the UI only hears about it when it crosses a confidence step.
+
+        Sightings and exact confidence are still persisted (recovery reseeds fusion from them).
+        """
+        previous = details.get("confidence")
+        visible = visible or previous is None or \
+            self._confidence_bucket(previous) != self._confidence_bucket(confidence)
+        details["confidence"] = confidence
+        if visible or persist or previous != confidence:
+            self._record(UPDATED, room, name, details, visible)
+
+    def remove(self, room: str, name: str):
+        """Drop an item (e.g. corrected by the user)"""
+        self.tracks.pop((room, name), None)
+        if self.inventory.get(room, {}).pop(name, None) is not None:
+            self._record(REMOVED, room, name, None)
+
+    def drain_deltas(self) -> List[InventoryDelta]:
+        """Changes since the last drain, one per item, in sequence order"""
+        deltas = sorted(self._pending.values(), key=lambda d: d.seq)
+        self._pending.clear()
+        return deltas
+
+    def room_deltas(self, room: str) -> List[InventoryDelta]:
+        """Pending changes for one room, without draining them"""
+        return sorted((d for d in self._pending.values() if d.room == room), key=lambda d: d.seq)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rooms": len(self.inventory),
+            "items": sum(len(items) for items in self.inventory.values()),
+            "tracked": len(self.tracks),
+            "pending_deltas": len(self._pending),
+            "seq": self.seq,
+        }
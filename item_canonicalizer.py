@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Item-name canonicalization for the moving inventory
+Maps the vision model's free-form item names ("couch", "3-seat sofa", "sofas")
+onto one canonical name ("sofa") using a synonym table loaded from
+item_vocabulary.json, light plural lemmatization, modifier stripping and a
+character-trigram fuzzy matcher. Results are memoized in an LRU cache, so a
+raw name costs a single dictionary lookup after the first time it is seen.
+"""
+
+import os
+import re
+import json
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Canonicalization Configuration
+CANONICALIZER_CONFIG = {
+    "vocabulary_path": os.getenv(
+        "ITEM_VOCABULARY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "item_vocabulary.json")
+    ),
+    "fuzzy_threshold": float(os.getenv("ITEM_FUZZY_THRESHOLD", "0.6")),  # Trigram Jaccard similarity
+    "memo_size": int(os.getenv("ITEM_MEMO_SIZE", "4096")),
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def lemmatize(word: str) -> str:
+    """Very small English plural -> singular reduction for item nouns"""
+    if len(word) <= 3 or word.endswith("ss"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("us", "is")):
+        return word[:-1]
+    return word
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ItemCanonicalizer:
+    def __init__(self, vocabulary: Optional[Dict] = None, fuzzy_threshold: float = None, memo_size: int = None):
+        vocabulary = vocabulary if vocabulary is not None else self.load_vocabulary()
+        self.fuzzy_threshold = fuzzy_threshold or CANONICALIZER_CONFIG["fuzzy_threshold"]
+        self.modifiers = set(vocabulary.get("modifiers", []))
+        self.synonyms: Dict[str, str] = {}  # normalized phrase -> canonical name
+        self.trigram_index: Dict[str, Set[str]] = defaultdict(set)  # trigram -> phrases containing it
+        self.phrase_trigrams: Dict[str, Set[str]] = {}
+
+        for canonical, aliases in vocabulary.get("canonical", {}).items():
+            for phrase in [canonical, *aliases]:
+                self._add_phrase(phrase, canonical)
+
+        self._memo = lru_cache(maxsize=memo_size or CANONICALIZER_CONFIG["memo_size"])(self._canonicalize)
+
+    @staticmethod
+    def load_vocabulary(path: Optional[str] = None) -> Dict:
+        """Load the maintained vocabulary file (an empty vocabulary if it is missing)"""
+        path = path or CANONICALIZER_CONFIG["vocabulary_path"]
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"⚠️ Item vocabulary not found at {path} - names will only be normalized")
+            return {}
+
+    def _tokens(self, raw: str) -> List[str]:
+        return [lemmatize(token) for token in _NON_ALNUM.sub(" ", raw.lower()).split()]
+
+    def _add_phrase(self, phrase: str, canonical: str):
+        key = " ".join(self._tokens(phrase))
+        self.synonyms[key] = canonical
+        grams = self.phrase_trigrams[key] = trigrams(key)
+        for gram in grams:
+            self.trigram_index[gram].add(key)
+
+    def _fuzzy_match(self, key: str) -> Optional[str]:
+        grams = trigrams(key)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for phrase in self.trigram_index.get(gram, ()):
+                overlap[phrase] += 1
+
+        best, best_score = None, 0.0
+        for phrase, shared in overlap.items():
+            score = shared / (len(grams) + len(self.phrase_trigrams[phrase]) - shared)
+            if score > best_score:
+                best, best_score = phrase, score
+        return self.synonyms[best] if best and best_score >= self.fuzzy_threshold else None
+
+    def _canonicalize(self, raw: str) -> str:
+        tokens = self._tokens(raw)
+        if not tokens:
+            return "item"
+
+        # 1. The whole (lemmatized) phrase is a known name or synonym
+        key = " ".join(tokens)
+        if key in self.synonyms:
+            return self.synonyms[key]
+
+        # 2. Drop numbers and descriptive modifiers ("3-seat", "large", "wooden")
+        core = [t for t in tokens if not t.isdigit() and t not in self.modifiers] or tokens
+        core_key = " ".join(core)
+        if core_key in self.synonyms:
+            return self.synonyms[core_key]
+
+        # 3. The head noun alone ("leather sectional couch" -> "couch")
+        if core[-1] in self.synonyms:
+            return self.synonyms[core[-1]]
+
+        # 4. Fuzzy match for misspellings and near variants
+        return self._fuzzy_match(core_key) or core_key
+
+    def canonicalize(self, raw: str) -> str:
+        """Canonical inventory name for a raw item name"""
+        return self._memo(raw)
+
+    def cache_info(self):
+        return self._memo.cache_info()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Multi-room soak/load test for a single agent worker
+Runs N simulated consultations at once in one process. Each one has a local
+fake LiveKit room (participant connect/disconnect, a synthetic video track
+at the chosen fps, capture and resync requests on the data channel), a fake
+Anam avatar and the fake vision backend, with EnhancedAnamAgent (or
+AnamAvatarAgent) driving it. Every room count in the sweep is reported with
+CPU, RSS, event-loop lag, avatar tick lateness and end-to-end vision
+latency, giving a capacity curve for one worker.
+
+Usage:
+    python load_test.py --rooms 1,2,4,8,16 --duration 60 --fps 10
+    python load_test.py --agent avatar --rooms 10,50,100 --output capacity.json
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+from typing import Dict, List
+
+from benchmark_pipeline import configure_offline_environment, git_commit, latency_summary, rss_bytes
+
+
+async def sample_rss(samples: List[int], interval: float = 0.5):
+    while True:
+        samples.append(rss_bytes())
+        await asyncio.sleep(interval)
+
+
+async def run_room(index: int, agent, room, args):
+    """One consultation: connect, stream video with data-channel traffic, disconnect, tear down"""
+    from inventory_protocol import RESYNC_TOPIC
+    from simulcast_controller import CAPTURE_TOPIC
+    from synthetic_video import SyntheticRoomVideo, SyntheticVideoTrack
+
+    handler_tasks: List[asyncio.Task] = []
+
+    # Same wiring as the agents' entrypoints
+    room.on("participant_connected",
+            lambda p: handler_tasks.append(asyncio.create_task(agent.handle_participant_connected(p))))
+    room.on("participant_disconnected",
+            lambda p: handler_tasks.append(asyncio.create_task(agent.handle_participant_disconnected(p))))
+    if hasattr(agent, "request_capture"):
+        def on_data_received(packet):
+            if packet.topic == CAPTURE_TOPIC and packet.participant:
+                agent.request_capture(packet.participant.identity)
+            elif packet.topic == RESYNC_TOPIC:
+                handler_tasks.append(asyncio.create_task(agent.send_inventory_snapshot()))
+        room.on("data_received", on_data_received)
+        agent.open_consultation(room.name)
+
+    # Stagger joins so rooms do not all start in lockstep
+    await asyncio.sleep(random.uniform(0, min(2.0, args.duration / 4)))
+    participant = room.connect_participant(f"client-{index}")
+
+    async def data_channel_traffic():
+        while True:
+            await asyncio.sleep(random.uniform(3, 8))
+            topic = random.choice([CAPTURE_TOPIC, RESYNC_TOPIC])
+            room.send_data(b"", topic, participant)
+
+    traffic = asyncio.create_task(data_channel_traffic())
+    try:
+        if hasattr(agent, "process_video_track"):
+            video = SyntheticRoomVideo(args.width, args.height, args.fps, args.scene_seconds, seed=args.seed + index)
+            track = SyntheticVideoTrack(video, args.duration, sid=f"TR_load{index}")
+            await agent.process_video_track(track, participant)
+        else:
+            await asyncio.sleep(args.duration)
+    finally:
+        traffic.cancel()
+
+    room.disconnect_participant(participant.identity)
+    await asyncio.gather(*handler_tasks, return_exceptions=True)
+    if hasattr(agent, "close"):
+        await agent.close()
+
+
+async def run_level(rooms: int, args, agent_module) -> Dict:
+    import fake_livekit
+    from loop_monitor import LoopLagMonitor
+
+    result_latencies: List[float] = []
+
+    if args.agent == "enhanced":
+        class LoadTestAgent(agent_module.EnhancedAnamAgent):
+            async def handle_vision_result(self, job, detection):
+                await super().handle_vision_result(job, detection)
+                if job.captured_at is not None:
+                    result_latencies.append(time.monotonic() - job.captured_at)
+        agent_cls = LoadTestAgent
+    else:
+        agent_cls = agent_module.AnamAvatarAgent
+
+    fake_livekit.AVATAR_TICK_LATENESS.clear()
+    monitor = LoopLagMonitor()
+    monitor.start()
+    rss_samples: List[int] = []
+    sampler = asyncio.create_task(sample_rss(rss_samples))
+
+    rooms_list = [fake_livekit.FakeRoom(f"load-{rooms}-{i}") for i in range(rooms)]
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_room(i, agent_cls(), room, args) for i, room in enumerate(rooms_list)),
+        return_exceptions=True,
+    )
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    sampler.cancel()
+    monitor.stop()
+    errors = [repr(r) for r in results if isinstance(r, Exception)]
+
+    return {
+        "rooms": rooms,
+        "wall_seconds": wall,
+        "cpu_utilization": cpu / wall if wall else 0.0,
+        "cpu_seconds_per_room": cpu / rooms,
+        "rss_peak_mb": max(rss_samples, default=rss_bytes()) / 2**20,
+        "rss_end_mb": rss_bytes() / 2**20,
+        "loop_lag": monitor.stats(),
+        "avatar_tick_lateness": latency_summary(fake_livekit.AVATAR_TICK_LATENESS),
+        "end_to_end": latency_summary(result_latencies),
+        "packets_sent": sum(room.local_participant.packets_sent for room in rooms_list),
+        "bytes_sent": sum(room.local_participant.bytes_sent for room in rooms_list),
+        "errors": errors,
+    }
+
+
+async def run_sweep(args) -> Dict:
+    import fake_livekit
+    if args.agent == "enhanced":
+        import enhanced_anam_agent as agent_module
+    else:
+        import avatar_agent as agent_module
+    fake_livekit.install_fakes(agent_module)
+    fake_livekit.FakeAvatarSession.connect_latency = args.avatar_connect_ms / 1000
+
+    levels = []
+    for rooms in args.rooms:
+        level = await run_level(rooms, args, agent_module)
+        levels.append(level)
+        degraded = level["avatar_tick_lateness"]["p99_ms"] > args.max_avatar_lateness_ms
+        print(f"{'⚠️' if degraded else '✅'} {rooms:>4} rooms: CPU {level['cpu_utilization']:.0%}, "
+              f"RSS {level['rss_peak_mb']:.0f} MB, loop lag p99 {level['loop_lag']['lag_p99_ms']:.0f} ms, "
+              f"avatar lateness p99 {level['avatar_tick_lateness']['p99_ms']:.1f} ms, "
+              f"e2e p99 {level['end_to_end']['p99_ms']:.0f} ms")
+
+    healthy = [level["rooms"] for level in levels
+               if level["avatar_tick_lateness"]["p99_ms"] <= args.max_avatar_lateness_ms
+               and not level["errors"]]
+    return {
+        "load_test": args.agent,
+        "format_version": 1,
+        "timestamp": time.time(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: getattr(args, k) for k in
+                   ("agent", "rooms", "duration", "width", "height", "fps", "scene_seconds", "latency_ms",
+                    "avatar_connect_ms", "max_avatar_lateness_ms", "seed")},
+        "capacity_rooms": max(healthy, default=0),
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-room soak/load test with fake LiveKit rooms and avatars")
+    parser.add_argument("--agent", choices=["enhanced", "avatar"], default="enhanced")
+    parser.add_argument("--rooms", default="1,2,4,8", help="Comma-separated room counts to sweep")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds each consultation streams video")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--scene-seconds", type=float, default=6.0)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median fake vision latency")
+    parser.add_argument("--avatar-connect-ms", type=float, default=300.0, help="Fake avatar start latency")
+    parser.add_argument("--max-avatar-lateness-ms", type=float, default=20.0,
+                        help="Avatar tick p99 lateness above which a level counts as degraded")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON capacity report here")
+    args = parser.parse_args()
+    args.rooms = [int(n) for n in args.rooms.split(",") if n.strip()]
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="dave-load-") as workdir:
+        configure_offline_environment(workdir, args.latency_ms, 0.3, args.seed)
+        report = asyncio.run(run_sweep(args))
+
+    print(f"📈 Capacity: {report['capacity_rooms']} rooms per worker "
+          f"(avatar p99 lateness <= {args.max_avatar_lateness_ms:.0f} ms)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
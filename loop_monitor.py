@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag monitor and blocking-call detector
+A sampler task sleeps for a fixed interval and records how late it wakes up
+(the loop lag) into a histogram. A watchdog thread watches the sampler's
+heartbeat; when the loop has not run for longer than the stall threshold it
+grabs the loop thread's current stack, which points at the blocking call
+while it is still blocking. Lag percentiles are exported on the pipeline
+metrics endpoint and in stats().
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from pipeline_metrics import Histogram, metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Loop Monitor Configuration
+LOOP_MONITOR_CONFIG = {
+    "enabled": os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true",
+    "interval": float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1")),  # Seconds between lag samples
+    "stall_threshold": float(os.getenv("LOOP_MONITOR_STALL_THRESHOLD", "0.25")),  # Seconds blocked before a stack is taken
+    "max_stalls": int(os.getenv("LOOP_MONITOR_MAX_STALLS", "20")),  # Recent stall stacks kept
+}
+
+# Lag bounds in seconds: 1ms .. 10s
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = None, stall_threshold: float = None, max_stalls: int = None):
+        self.interval = interval or LOOP_MONITOR_CONFIG["interval"]
+        self.stall_threshold = stall_threshold or LOOP_MONITOR_CONFIG["stall_threshold"]
+        self.lag = Histogram(LAG_BUCKETS)
+        self.max_lag = 0.0
+        self.stalls: Deque[Dict] = deque(maxlen=max_stalls or LOOP_MONITOR_CONFIG["max_stalls"])
+        self.stall_count = 0
+        self.task: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._registered = False
+
+    def start(self):
+        """Start sampling the running loop (idempotent; call from inside the loop)"""
+        if self.task or not LOOP_MONITOR_CONFIG["enabled"]:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self.task = asyncio.create_task(self._sample())
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+        if not self._registered:
+            metrics_server.add_renderer(self.render)
+            self._registered = True
+        logger.info(f"⏱️ Event-loop monitor started (stall threshold {self.stall_threshold * 1000:.0f}ms)")
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self.lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self):
+        """Runs on its own thread, so it still gets scheduled while the loop is blocked"""
+        reported_heartbeat = None
+        while not self._stop.wait(self.stall_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.stall_threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat  # One stack per stall
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<loop thread not found>"
+            self.stall_count += 1
+            self.stalls.append({"ts": time.time(), "blocked_ms": blocked_for * 1000, "stack": stack})
+            logger.warning(f"🐢 Event loop blocked for {blocked_for * 1000:.0f}ms at:\n{stack}")
+
+    def stop(self):
+        self._stop.set()
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        self.watchdog = None
+
+    def stats(self) -> Dict[str, float]:
+        """Lag percentiles (bucket upper bounds, ms) and stall counts"""
+        return {
+            "samples": self.lag.count,
+            "lag_p50_ms": self.lag.quantile(0.5) * 1000,
+            "lag_p90_ms": self.lag.quantile(0.9) * 1000,
+            "lag_p99_ms": self.lag.quantile(0.99) * 1000,
+            "lag_max_ms": self.max_lag * 1000,
+            "stalls": self.stall_count,
+        }
+
+    def render(self) -> str:
+        """Prometheus lag histogram and stall counter"""
+        name = "dave_event_loop_lag_seconds"
+        counts, total, count = self.lag.snapshot()
+        lines = [f"# HELP {name} Event-loop scheduling lag in seconds", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(self.lag.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{name}_sum {total}")
+        lines.append(f"{name}_count {count}")
+        lines.append("# HELP dave_event_loop_stalls_total Times the loop was blocked past the stall threshold")
+        lines.append("# TYPE dave_event_loop_stalls_total counter")
+        lines.append(f"dave_event_loop_stalls_total {self.stall_count}")
+        return "\n".join(lines) + "\n"
+
+
+# One monitor per worker process / event loop
+loop_monitor = LoopLagMonitor()
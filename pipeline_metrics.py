@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency histograms for the agent pipeline
+Each pipeline stage (frame receive, conversion, encode, queue wait,
+rate-limit wait, vision round trip, parse, inventory merge, data-channel
+publish, avatar start/stop) records its duration into a fixed-bucket histogram. Recording is a bisect
+and three additions under a lock, cheap enough for every frame and safe from
+the encoder threads. The histograms are served in Prometheus text format on
+a local HTTP endpoint, one per worker process.
+"""
+
+import os
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Metrics Configuration
+METRICS_CONFIG = {
+    "enabled": os.getenv("PIPELINE_METRICS_ENABLED", "true").lower() == "true",
+    "host": os.getenv("PIPELINE_METRICS_HOST", "127.0.0.1"),
+    "port": int(os.getenv("PIPELINE_METRICS_PORT", "9464")),
+    "port_attempts": int(os.getenv("PIPELINE_METRICS_PORT_ATTEMPTS", "16")),  # Next free port for extra workers
+}
+
+# Upper bounds in seconds: 0.5ms .. 60s, roughly x2.5 per bucket
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Pipeline stages, in frame order
+FRAME_RECEIVE = "frame_receive"
+CONVERT = "convert"
+ENCODE = "encode"
+QUEUE_WAIT = "queue_wait"
+RATE_LIMIT_WAIT = "rate_limit_wait"  # Waiting for provider quota (rate_limiter.py)
+VISION_REQUEST = "vision_request"
+PARSE = "parse"
+INVENTORY_MERGE = "inventory_merge"
+PUBLISH = "publish"
+END_TO_END = "end_to_end"  # Frame arrival to vision result merged
+AVATAR_START = "avatar_start"
+AVATAR_STOP = "avatar_stop"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile (bucket upper bound), e.g. 0.99 for p99"""
+        counts, _, count = self.snapshot()
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class PipelineMetrics:
+    """Stage latency histograms, labelled by stage"""
+
+    def __init__(self, name: str = "dave_pipeline_stage_seconds", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.enabled = METRICS_CONFIG["enabled"]
+        self.stages: Dict[str, Histogram] = {}
+        self.lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self.lock:
+                histogram = self.stages.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        if self.enabled:
+            self.histogram(stage).observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time a block (sync or async body) into a stage histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and p50/p99 (ms) per stage, for log lines"""
+        return {
+            stage: {
+                "count": histogram.count,
+                "p50_ms": histogram.quantile(0.5) * 1000,
+                "p99_ms": histogram.quantile(0.99) * 1000,
+            }
+            for stage, histogram in sorted(self.stages.items())
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            f"# HELP {self.name} Latency of each agent pipeline stage in seconds",
+            f"# TYPE {self.name} histogram",
+        ]
+        for stage, histogram in sorted(self.stages.items()):
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide metrics shared by every agent and pipeline module
+PIPELINE_METRICS = PipelineMetrics()
+
+
+class MetricsServer:
+    """Local /metrics endpoint; also serves extra renderers registered by other modules"""
+
+    def __init__(self, metrics: PipelineMetrics = PIPELINE_METRICS):
+        self.metrics = metrics
+        self.renderers = [metrics.render]
+        self.runner = None
+        self.port: Optional[int] = None
+
+    def add_renderer(self, render):
+        self.renderers.append(render)
+
+    async def _handle_metrics(self, request):
+        body = "".join(render() for render in self.renderers)
+        return web.Response(body=body.encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def start(self, host: str = None, port: int = None) -> Optional[int]:
+        """Bind the first free port from the configured one; returns the port, or None if disabled/unavailable"""
+        if self.runner or not METRICS_CONFIG["enabled"]:
+            return self.port
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+
+        host = host or METRICS_CONFIG["host"]
+        base_port = METRICS_CONFIG["port"] if port is None else port
+        for candidate in range(base_port, base_port + max(1, METRICS_CONFIG["port_attempts"])):
+            try:
+                site = web.TCPSite(runner, host, candidate)
+                await site.start()
+            except OSError:
+                continue
+            self.runner, self.port = runner, candidate
+            logger.info(f"📈 Pipeline metrics on http://{host}:{candidate}/metrics")
+            return candidate
+
+        await runner.cleanup()
+        logger.warning(f"⚠️ No free port for pipeline metrics in {base_port}+{METRICS_CONFIG['port_attempts']}")
+        return None
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+            self.port = None
+
+
+# One endpoint per worker process
+metrics_server = MetricsServer()
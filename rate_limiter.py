@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Process-wide priority-aware rate limiting for vision/LLM calls
+Two token buckets, requests per minute and model tokens per minute, guard
+the shared provider quota for every room in the worker (or, with
+RATE_LIMIT_SHARED_PATH, for every worker on the machine via a small SQLite
+file). Callers wait in priority classes: explicit user captures first, then
+new-scene keyframes, then periodic refreshes of a settled view. Lower
+classes also leave a slice of each bucket in reserve and give up sooner, so
+a burst of background frames cannot starve a capture into a 429 storm.
+Within a class, waiting sessions are served round-robin.
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from fair_scheduler import FairScheduler
+from pipeline_metrics import PIPELINE_METRICS, RATE_LIMIT_WAIT, metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Rate Limit Configuration
+RATE_LIMIT_CONFIG = {
+    "enabled": os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+    "rpm": float(os.getenv("RATE_LIMIT_RPM", "500")),  # Requests per minute (0 = unlimited)
+    "tpm": float(os.getenv("RATE_LIMIT_TPM", "200000")),  # Model tokens per minute (0 = unlimited)
+    "request_tokens": int(os.getenv("RATE_LIMIT_REQUEST_TOKENS", "800")),  # Prompt + response estimate per call
+    "image_tokens": int(os.getenv("RATE_LIMIT_IMAGE_TOKENS", "1000")),  # Estimate per attached image
+    "shared_path": os.getenv("RATE_LIMIT_SHARED_PATH"),  # SQLite file shared by workers; unset = this process only
+    "max_waiters": int(os.getenv("RATE_LIMIT_MAX_WAITERS", "32")),  # Queued calls per session and class
+    "poll_interval": float(os.getenv("RATE_LIMIT_POLL_INTERVAL", "0.25")),  # Max sleep between shared-store checks
+}
+
+# Priority classes, most important first
+CAPTURE = 0
+NEW_SCENE = 1
+REFRESH = 2
+PRIORITY_NAMES = {CAPTURE: "capture", NEW_SCENE: "new_scene", REFRESH: "refresh"}
+
+# Seconds a call may wait for quota before it is shed
+MAX_WAIT = {
+    CAPTURE: float(os.getenv("RATE_LIMIT_CAPTURE_MAX_WAIT", "30")),
+    NEW_SCENE: float(os.getenv("RATE_LIMIT_NEW_SCENE_MAX_WAIT", "10")),
+    REFRESH: float(os.getenv("RATE_LIMIT_REFRESH_MAX_WAIT", "2")),
+}
+
+# Fraction of each bucket a class must leave untouched for the classes above it
+RESERVE = {
+    CAPTURE: 0.0,
+    NEW_SCENE: float(os.getenv("RATE_LIMIT_NEW_SCENE_RESERVE", "0.1")),
+    REFRESH: float(os.getenv("RATE_LIMIT_REFRESH_RESERVE", "0.3")),
+}
+
+REQUESTS = "requests"
+TOKENS = "tokens"
+
+
+def estimate_tokens(images: int) -> int:
+    """Rough model-token cost of one vision call with the given number of images"""
+    return RATE_LIMIT_CONFIG["request_tokens"] + images * RATE_LIMIT_CONFIG["image_tokens"]
+
+
+def refill_and_take(levels: Dict[str, Tuple[float, float]], capacities: Dict[str, float],
+                    costs: Dict[str, float], reserve: float, now: float) -> Tuple[float, Dict[str, Tuple[float, float]]]:
+    """Token-bucket arithmetic shared by the stores.
+
+    levels maps bucket -> (level, updated_at); a missing bucket starts full.
+    Returns (seconds to wait, new levels): 0 means the costs were taken,
+    otherwise nothing was taken and the wait is how long until they would fit.
+    """
+    refilled = {}
+    wait = 0.0
+    for bucket, capacity in capacities.items():
+        level, updated_at = levels.get(bucket, (capacity, now))
+        rate = capacity / 60.0
+        level = min(capacity, level + max(0.0, now - updated_at) * rate)
+        refilled[bucket] = (level, now)
+        # A single call larger than the bucket can only ever run from a full one
+        needed = min(capacity, costs.get(bucket, 0.0) + reserve * capacity)
+        if level < needed:
+            wait = max(wait, (needed - level) / rate)
+
+    if wait > 0:
+        return wait, refilled
+    return 0.0, {bucket: (level - costs.get(bucket, 0.0), now) for bucket, (level, _) in refilled.items()}
+
+
+class MemoryBucketStore:
+    """Buckets shared by everything in this process"""
+
+    def __init__(self, capacities: Dict[str, float]):
+        self.capacities = capacities
+        self.levels: Dict[str, Tuple[float, float]] = {}
+
+    async def try_take(self, costs: Dict[str, float], reserve: float) -> float:
+        wait, self.levels = refill_and_take(self.levels, self.capacities, costs, reserve, time.monotonic())
+        return wait
+
+    def levels_now(self) -> Dict[str, float]:
+        _, levels = refill_and_take(self.levels, self.capacities, {}, 0.0, time.monotonic())
+        return {bucket: level for bucket, (level, _) in levels.items()}
+
+    def close(self):
+        pass
+
+
+class SQLiteBucketStore:
+    """Buckets in a local SQLite file, shared by every worker process that points at it"""
+
+    def __init__(self, path: str, capacities: Dict[str, float]):
+        self.path = path
+        self.capacities = capacities
+        self.conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _take(self, costs: Dict[str, float], reserve: float) -> float:
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so refill + take is atomic across processes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = {
+                    name: (level, updated_at)
+                    for name, level, updated_at in self.conn.execute("SELECT name, level, updated_at FROM buckets")
+                    if name in self.capacities
+                }
+                wait, levels = refill_and_take(levels, self.capacities, costs, reserve, time.time())
+                self.conn.executemany(
+                    "INSERT INTO buckets (name, level, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET level = excluded.level, updated_at = excluded.updated_at",
+                    [(name, level, updated_at) for name, (level, updated_at) in levels.items()],
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    async def try_take(self, costs: Dict[str, float], reserve: float) -> float:
+        return await asyncio.to_thread(self._take, costs, reserve)
+
+    def levels_now(self) -> Dict[str, float]:
+        with self.lock:
+            levels = {name: (level, updated_at) for name, level, updated_at in
+                      self.conn.execute("SELECT name, level, updated_at FROM buckets")}
+        _, levels = refill_and_take(levels, self.capacities, {}, 0.0, time.time())
+        return {bucket: level for bucket, (level, _) in levels.items()}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+@dataclass
+class Waiter:
+    session: str
+    priority: int
+    costs: Dict[str, float]
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class PriorityRateLimiter:
+    def __init__(self, rpm: float = None, tpm: float = None, shared_path: Optional[str] = None):
+        rpm = RATE_LIMIT_CONFIG["rpm"] if rpm is None else rpm
+        tpm = RATE_LIMIT_CONFIG["tpm"] if tpm is None else tpm
+        self.capacities = {bucket: capacity for bucket, capacity in ((REQUESTS, rpm), (TOKENS, tpm)) if capacity > 0}
+        shared_path = shared_path or RATE_LIMIT_CONFIG["shared_path"]
+        self.shared = bool(shared_path)
+        self.store = (SQLiteBucketStore(shared_path, self.capacities) if self.shared
+                      else MemoryBucketStore(self.capacities))
+        self.enabled = RATE_LIMIT_CONFIG["enabled"] and bool(self.capacities)
+        self.counters = {name: {"granted": 0, "waited": 0, "shed": 0} for name in PRIORITY_NAMES.values()}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[int, FairScheduler] = {}
+        self._heads: Dict[int, Waiter] = {}  # Waiter taken off a class queue but not yet granted
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        metrics_server.add_renderer(self.render)
+
+    def _bind_loop(self):
+        """Waiter queues belong to one event loop; start fresh if a new loop is running"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queues = {
+                priority: FairScheduler(RATE_LIMIT_CONFIG["max_waiters"], "reject") for priority in PRIORITY_NAMES
+            }
+            self._heads = {}
+            self._wakeup = asyncio.Event()
+            self._dispatcher = None
+
+    def _waiting_at_or_above(self, priority: int) -> bool:
+        """Whether a live waiter of this class or a more important one is queued"""
+        return any((p in self._heads and not self._heads[p].future.done()) or not self._queues[p].empty()
+                   for p in PRIORITY_NAMES if p <= priority)
+
+    def _forget(self, waiter: Waiter):
+        """Drop a waiter that gave up (timed out or cancelled) so it no longer blocks the fast path"""
+        if self._heads.get(waiter.priority) is waiter:
+            del self._heads[waiter.priority]
+        else:
+            self._queues[waiter.priority].discard(waiter.session, waiter)
+
+    async def acquire(self, session: str, priority: int = REFRESH, tokens: int = 0, wait: bool = True) -> bool:
+        """Wait for quota for one call; False means the call was shed and should not be made.
+
+        With wait=False the call is only granted if quota is free right now
+        (used for optional extra requests such as hedges).
+        """
+        if not self.enabled:
+            return True
+        self._bind_loop()
+        name = PRIORITY_NAMES[priority]
+        costs = {REQUESTS: 1.0, TOKENS: float(tokens)}
+
+        # Fast path: nobody more (or equally) important is queued and the quota is there
+        if not self._waiting_at_or_above(priority) and await self.store.try_take(costs, RESERVE[priority]) == 0:
+            self.counters[name]["granted"] += 1
+            return True
+        if not wait:
+            self.counters[name]["shed"] += 1
+            return False
+
+        waiter = Waiter(session, priority, costs, self._loop.create_future())
+        if self._queues[priority].put(session, waiter) is waiter:
+            self.counters[name]["shed"] += 1
+            return False
+        self.counters[name]["waited"] += 1
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), MAX_WAIT[priority])
+        except asyncio.TimeoutError:
+            waiter.future.cancel()
+            self.counters[name]["shed"] += 1
+            logger.debug(f"Rate limit: {name} call for {session} shed after {MAX_WAIT[priority]:.0f}s")
+            return False
+        finally:
+            if not waiter.future.done():
+                waiter.future.cancel()  # The caller itself was cancelled
+            if waiter.future.cancelled():
+                self._forget(waiter)
+        PIPELINE_METRICS.observe(RATE_LIMIT_WAIT, time.monotonic() - waiter.queued_at)
+        self.counters[name]["granted"] += 1
+        return True
+
+    def _next_head(self) -> Optional[Waiter]:
+        """The highest-priority live waiter (round-robin across sessions within its class)"""
+        for priority in sorted(PRIORITY_NAMES):
+            head = self._heads.get(priority)
+            while head is None or head.future.done():
+                head = self._queues[priority].get_nowait()
+                if head is None:
+                    break
+            if head is not None:
+                self._heads[priority] = head
+                return head
+            self._heads.pop(priority, None)
+        return None
+
+    async def _dispatch(self):
+        """Grant waiters strictly by priority as the buckets refill"""
+        while True:
+            self._wakeup.clear()
+            head = self._next_head()
+            if head is None:
+                return
+
+            wait = await self.store.try_take(head.costs, RESERVE[head.priority])
+            if wait == 0:
+                del self._heads[head.priority]
+                if head.future.done():
+                    continue  # Shed while we were checking; the quota stays taken, as a real call would have
+                head.future.set_result(None)
+                continue
+
+            # Sleep until the bucket should have refilled, waking early for a more important arrival;
+            # a shared store is polled because other processes consume from it too
+            if self.shared:
+                wait = min(wait, RATE_LIMIT_CONFIG["poll_interval"])
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict:
+        waiting = {
+            name: sum(1 for queue in self._queues[p].queues.values() for w in queue if not w.future.done())
+            + (p in self._heads and not self._heads[p].future.done())
+            for p, name in PRIORITY_NAMES.items()
+        } if self._queues else {}
+        return {
+            "enabled": self.enabled,
+            "shared": self.shared,
+            "levels": {bucket: round(level, 1) for bucket, level in self.store.levels_now().items()},
+            "waiting": waiting,
+            **self.counters,
+        }
+
+    def render(self) -> str:
+        """Prometheus counters per priority class and current bucket levels"""
+        lines = [
+            "# HELP dave_rate_limit_calls_total Rate-limited calls by priority class and outcome",
+            "# TYPE dave_rate_limit_calls_total counter",
+        ]
+        for name, counts in self.counters.items():
+            lines += [f'dave_rate_limit_calls_total{{priority="{name}",outcome="{outcome}"}} {count}'
+                      for outcome, count in counts.items()]
+        lines += [
+            "# HELP dave_rate_limit_bucket_level Tokens currently available in each bucket",
+            "# TYPE dave_rate_limit_bucket_level gauge",
+        ]
+        lines += [f'dave_rate_limit_bucket_level{{bucket="{bucket}"}} {level:.1f}'
+                  for bucket, level in self.store.levels_now().items()]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self.store.close()
+
+
+# Process-wide limiter shared by every consultation in this worker
+rate_limiter = PriorityRateLimiter()
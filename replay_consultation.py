@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Replay recorded consultation video through the enhanced agent's pipeline
+Frames recorded with FRAME_RECORD_DIR set (see frame_store.py) are fed back
+through EnhancedAnamAgent.process_video_frame at real-time or accelerated
+speed against the fake vision backend. Frames from all tracks are merged by
+timestamp and processed in lockstep (each frame's analysis finishes before
+the next frame goes in), so the same recording and settings always produce
+the same analyses and inventory. That makes A/B comparisons of pipeline
+changes meaningful.
+
+Usage:
+    FRAME_RECORD_DIR=recordings python enhanced_anam_agent.py dev
+    python replay_consultation.py recordings/room-alice_TR_abc --speed 4 --output before.json
+    python replay_consultation.py recordings/room-alice_TR_abc --speed 0 --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import asyncio
+import hashlib
+import argparse
+import tempfile
+from typing import Dict, List
+
+from benchmark_pipeline import configure_offline_environment, git_commit
+
+
+def inventory_digest(inventory: Dict) -> str:
+    return hashlib.sha256(json.dumps(inventory, sort_keys=True).encode()).hexdigest()[:16]
+
+
+async def replay(args) -> Dict:
+    import enhanced_anam_agent as agent_module
+    from frame_store import FrameStoreReader
+
+    readers = {f"replay/{os.path.basename(base)}": FrameStoreReader(base) for base in args.stores}
+    agent = agent_module.EnhancedAnamAgent()
+    agent.open_consultation(f"replay-{int(time.time())}")
+
+    # One timeline across all tracks: (timestamp, track key, frame index)
+    timeline = heapq.merge(*(
+        ((reader.timestamp(i), key, i) for i in range(len(reader))) for key, reader in readers.items()
+    ))
+
+    frames = 0
+    start = time.monotonic()
+    for timestamp, key, i in timeline:
+        if args.speed > 0:
+            delay = start + timestamp / args.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await agent.process_video_frame(readers[key].frame(i), key)
+        await agent.vision_pool.join()
+        frames += 1
+    wall = time.monotonic() - start
+
+    report = {
+        "replay": [os.path.abspath(base) for base in args.stores],
+        "git_commit": git_commit(),
+        "config": {"speed": args.speed, "latency_ms": args.latency_ms, "seed": args.seed},
+        "frames": frames,
+        "recorded_seconds": max((reader.duration for reader in readers.values()), default=0.0),
+        "wall_seconds": wall,
+        "api_calls": agent.vision_pool.stats()["requests"],
+        "vision_pool": agent.vision_pool.stats(),
+        "dedup": agent.deduplicator.stats(),
+        "pre_stages": {
+            key: {type(stage).__name__: stage.stats() for stage in pipeline.pre_stages}
+            for key, pipeline in agent.tracks.items()
+        },
+        "inventory_digest": inventory_digest(agent.state.inventory),
+        "inventory": agent.state.inventory,
+        "notes": agent.state.consultation_notes,
+    }
+
+    await agent.close()
+    for reader in readers.values():
+        reader.close()
+    return report
+
+
+def compare(report: Dict, other: Dict) -> List[str]:
+    """Human-readable differences between two replays' API usage and inventories"""
+    lines = [f"api_calls: {other['api_calls']} -> {report['api_calls']}"]
+    before, after = other["inventory"], report["inventory"]
+    for room in sorted(set(before) | set(after)):
+        old_items, new_items = before.get(room, {}), after.get(room, {})
+        for name in sorted(set(old_items) | set(new_items)):
+            old, new = old_items.get(name), new_items.get(name)
+            if old is None:
+                lines.append(f"+ {room}/{name} x{new['qty']}")
+            elif new is None:
+                lines.append(f"- {room}/{name} x{old['qty']}")
+            elif old["qty"] != new["qty"] or old.get("fragile") != new.get("fragile"):
+                lines.append(f"~ {room}/{name} x{old['qty']} -> x{new['qty']}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic replay of recorded consultation video")
+    parser.add_argument("stores", nargs="+", help="Frame store base paths (without .frames/.index)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 4 = 4x, 0 = as fast as possible")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake vision latency per request")
+    parser.add_argument("--seed", type=int, default=42, help="Fake vision detection seed")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="Earlier replay report to diff against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dave-replay-") as workdir:
+        configure_offline_environment(workdir, args.latency_ms, 0.0, args.seed)
+        report = asyncio.run(replay(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"🎞️ Replayed {report['frames']} frames in {report['wall_seconds']:.1f}s: "
+              f"{report['api_calls']} API calls, inventory {report['inventory_digest']} -> {args.output}")
+    elif not args.compare:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            other = json.load(f)
+        identical = other["inventory_digest"] == report["inventory_digest"]
+        print("✅ Identical inventory" if identical else "⚠️ Inventory differs")
+        for line in compare(report, other):
+            print(f"  {line}")
+        sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
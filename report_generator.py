@@ -4,6 +4,7 @@ PDF Report Generator for Moving Consultation
 Generates professional PDF reports from inventory data
 """
 
+import argparse
 import json
 import os
 from datetime import datetime
@@ -14,9 +15,13 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
+from inventory_db import INVENTORY_DB_CONFIG, InventoryDatabase
+
 class MovingConsultationReport:
-    def __init__(self, inventory_file="inventory.json"):
+    def __init__(self, inventory_file="inventory.json", db_path=None, session_id=None):
         self.inventory_file = inventory_file
+        self.db_path = db_path
+        self.session_id = session_id
         self.styles = getSampleStyleSheet()
         self.setup_custom_styles()
         
@@ -66,7 +71,10 @@ class MovingConsultationReport:
         ))
 
     def load_inventory_data(self):
-        """Load inventory data from JSON file"""
+        """Load inventory data from the inventory database (when configured) or a JSON file"""
+        if self.db_path:
+            return self.load_inventory_from_db()
+        
         try:
             if not os.path.exists(self.inventory_file):
                 return None
@@ -77,11 +85,26 @@ class MovingConsultationReport:
             print(f"Error loading inventory data: {e}")
             return None
 
+    def load_inventory_from_db(self):
+        """Load one consultation (the latest by default) from the inventory database"""
+        try:
+            if not os.path.exists(self.db_path):
+                return None
+            
+            db = InventoryDatabase(self.db_path)
+            try:
+                return db.load_session(self.session_id)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Error loading inventory data from database: {e}")
+            return None
+
     def calculate_room_totals(self, items):
         """Calculate totals for a room"""
         total_items = sum(item['qty'] for item in items.values())
         fragile_items = sum(item['qty'] for item in items.values() if item.get('fragile', False))
-        large_items = sum(item['qty for item in items.values() if item.get('size') == 'large'])
+        large_items = sum(item['qty'] for item in items.values() if item.get('size') == 'large')
         
         return {
             'total_items': total_items,
@@ -234,10 +257,20 @@ class MovingConsultationReport:
 
 def main():
     """Main function to generate report"""
+    parser = argparse.ArgumentParser(description="Generate a moving consultation PDF report")
+    parser.add_argument("--db", default=INVENTORY_DB_CONFIG["path"], help="Inventory database path")
+    parser.add_argument("--session", help="Consultation/session id (defaults to the latest)")
+    parser.add_argument("--json", dest="inventory_file", help="Read a legacy inventory.json file instead")
+    parser.add_argument("--output", default="moving_consultation_report.pdf")
+    args = parser.parse_args()
+    
     print("📄 Generating Moving Consultation Report...")
     
-    report_generator = MovingConsultationReport()
-    success = report_generator.generate_pdf()
+    if args.inventory_file:
+        report_generator = MovingConsultationReport(inventory_file=args.inventory_file)
+    else:
+        report_generator = MovingConsultationReport(db_path=args.db, session_id=args.session)
+    success = report_generator.generate_pdf(args.output)
     
     if success:
         print("🎉 Report generation completed successfully!")
@@ -247,7 +280,7 @@ def main():
         print("  - Consultation notes")
         print("  - Summary statistics")
     else:
-        print("❌ Report generation failed. Check inventory.json file.")
+        print("❌ Report generation failed. Check the inventory database (or inventory.json file).")
 
 if __name__ == "__main__":
     main()
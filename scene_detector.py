@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local scene-change detection for the moving consultation agent
+A vectorized NumPy pre-stage that compares downscaled grayscale frames to
+the previous frame (camera motion) and to the last analyzed view (histogram
+distance and mean absolute difference). Only new scenes, and views the
+camera has settled on after moving, are passed on for vision analysis.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+# Scene Detection Configuration
+SCENE_CONFIG = {
+    "enabled": os.getenv("SCENE_DETECTION_ENABLED", "true").lower() == "true",
+    "size": int(os.getenv("SCENE_SAMPLE_SIZE", "64")),  # Longest side of the comparison thumbnail
+    "histogram_bins": int(os.getenv("SCENE_HISTOGRAM_BINS", "32")),
+    "motion_mad": float(os.getenv("SCENE_MOTION_MAD", "0.06")),  # Frame-to-frame MAD meaning "camera moving"
+    "new_scene_mad": float(os.getenv("SCENE_NEW_SCENE_MAD", "0.12")),  # MAD vs last analyzed view
+    "new_scene_histogram": float(os.getenv("SCENE_NEW_SCENE_HISTOGRAM", "0.25")),  # Histogram distance vs last analyzed view
+    "settle_frames": int(os.getenv("SCENE_SETTLE_FRAMES", "3")),  # Still frames before motion counts as over
+}
+
+SAME_VIEW = "same_view"
+CAMERA_MOVING = "camera_moving"
+NEW_SCENE = "new_scene"
+
+
+def grayscale_array(img: Image.Image, size: int) -> np.ndarray:
+    """Downscale an image to at most size x size and return luminance as float32 in [0, 1]"""
+    gray = img.convert("L")
+    gray.thumbnail((size, size), Image.BILINEAR)
+    return np.asarray(gray, dtype=np.float32) / 255.0
+
+
+def luminance_histogram(gray: np.ndarray, bins: int) -> np.ndarray:
+    """Normalized luminance histogram of a grayscale array"""
+    hist, _ = np.histogram(gray, bins=bins, range=(0.0, 1.0))
+    return hist / max(gray.size, 1)
+
+
+def histogram_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Total variation distance between two normalized histograms (0 = identical, 1 = disjoint)"""
+    return float(0.5 * np.abs(a - b).sum())
+
+
+def mean_abs_diff(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute pixel difference between two same-shaped arrays"""
+    if a.shape != b.shape:
+        return 1.0
+    return float(np.abs(a - b).mean())
+
+
+class SceneChangeDetector:
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = {**SCENE_CONFIG, **(config or {})}
+        self.previous: Optional[np.ndarray] = None
+        self.anchor: Optional[np.ndarray] = None  # Last view sent for analysis
+        self.anchor_hist: Optional[np.ndarray] = None
+        self.still_frames = 0
+        self.was_moving = False
+        self.counts = {SAME_VIEW: 0, CAMERA_MOVING: 0, NEW_SCENE: 0}
+        self.settled_sent = 0
+        self.last_label: Optional[str] = None  # Classification of the most recent frame
+
+    def classify(self, gray: np.ndarray, hist: np.ndarray) -> str:
+        """Classify a frame as same view, camera moving, or new scene"""
+        cfg = self.config
+        motion = mean_abs_diff(gray, self.previous) if self.previous is not None else 0.0
+        self.previous = gray
+
+        if motion > cfg["motion_mad"]:
+            self.still_frames = 0
+            self.was_moving = True
+            return CAMERA_MOVING
+
+        self.still_frames += 1
+        if self.was_moving and self.still_frames < cfg["settle_frames"]:
+            return CAMERA_MOVING  # Still settling
+
+        if self.anchor is None:
+            return NEW_SCENE
+        if (histogram_distance(hist, self.anchor_hist) > cfg["new_scene_histogram"]
+                or mean_abs_diff(gray, self.anchor) > cfg["new_scene_mad"]):
+            return NEW_SCENE
+        return SAME_VIEW
+
+    def should_analyze(self, img: Image.Image) -> bool:
+        """Classify a frame and decide whether it should be sent for vision analysis"""
+        gray = grayscale_array(img, self.config["size"])
+        hist = luminance_histogram(gray, self.config["histogram_bins"])
+        label = self.classify(gray, hist)
+        self.counts[label] += 1
+        self.last_label = label
+
+        # A settled view after movement is worth one look even if it resembles the last one
+        settled = label == SAME_VIEW and self.was_moving
+        if label != NEW_SCENE and not settled:
+            return False
+
+        if settled:
+            self.settled_sent += 1
+        self.was_moving = False
+        self.anchor = gray
+        self.anchor_hist = hist
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Frame counts per classification"""
+        return {**self.counts, "settled_sent": self.settled_sent}
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Per-room session registry for LiveKit agent workers
+Keeps one isolated session object (state, avatar, vision queues) per room/job
+so a single worker process can host many consultations at once, and tears
+each session down when its job ends.
+"""
+
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def session_key(ctx) -> str:
+    """Registry key for a job: the job id, falling back to the room name"""
+    job = getattr(ctx, "job", None)
+    job_id = getattr(job, "id", None)
+    return job_id or ctx.room.name
+
+
+async def consultation_id(ctx) -> str:
+    """Unique id for the consultation in a connected room: its name plus the room sid.
+
+    A worker that restarts mid-consultation gets the same id (the room, and so
+    its sid, lives on), while a later room reusing the name gets a new one.
+    Call after ctx.connect(); before that the room's name and sid are empty.
+    """
+    room = ctx.room
+    sid = room.sid
+    if inspect.isawaitable(sid):  # Newer livekit-rtc resolves the sid asynchronously
+        sid = await sid
+    return f"{room.name}-{sid or session_key(ctx)}"
+
+
+class SessionRegistry(Generic[T]):
+    def __init__(self, factory: Callable[[str], T],
+                 cleanup: Optional[Callable[[T], Awaitable[None]]] = None):
+        self.factory = factory
+        self.cleanup = cleanup
+        self.sessions: Dict[str, T] = {}
+        self.created = 0
+        self.released = 0
+
+    def get_or_create(self, key: str) -> T:
+        """Return the session for a room/job, creating it on first use"""
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = self.factory(key)
+            self.created += 1
+            logger.info(f"🗂️ Session created: {key} ({len(self.sessions)} active)")
+        return session
+
+    def get(self, key: str) -> Optional[T]:
+        return self.sessions.get(key)
+
+    def keys(self) -> List[str]:
+        return list(self.sessions)
+
+    async def release(self, key: str):
+        """Remove a session and run its cleanup"""
+        session = self.sessions.pop(key, None)
+        if session is None:
+            return
+        self.released += 1
+        try:
+            if self.cleanup:
+                await self.cleanup(session)
+        except Exception as e:
+            logger.error(f"❌ Error cleaning up session {key}: {e}")
+        logger.info(f"🗂️ Session released: {key} ({len(self.sessions)} active)")
+
+    async def close_all(self):
+        """Release every session, e.g. on worker shutdown"""
+        await asyncio.gather(*(self.release(key) for key in self.keys()))
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def stats(self) -> Dict[str, int]:
+        return {"active": len(self.sessions), "created": self.created, "released": self.released}
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Simulcast layer control for the vision pipeline
+Continuous scene monitoring only needs the low simulcast layer, since frames
+are downscaled before analysis anyway. When a keyframe is selected for vision
+analysis (or the user asks for a capture) the subscription is switched to the
+high layer just long enough to grab one full-resolution frame.
+"""
+
+import asyncio
+import os
+import logging
+from typing import Any, Optional
+
+from livekit import rtc
+
+logger = logging.getLogger(__name__)
+
+# Simulcast Configuration
+SIMULCAST_CONFIG = {
+    "enabled": os.getenv("SIMULCAST_LOW_RES_MONITORING", "true").lower() == "true",
+    "monitor_quality": os.getenv("SIMULCAST_MONITOR_QUALITY", "LOW"),
+    "capture_quality": os.getenv("SIMULCAST_CAPTURE_QUALITY", "HIGH"),
+    "capture_timeout": float(os.getenv("SIMULCAST_CAPTURE_TIMEOUT", "1.5")),  # Seconds to wait for the high layer
+}
+
+# Data channel topic the meeting UI uses to request a full-resolution capture
+CAPTURE_TOPIC = "dave.capture"
+
+
+def video_quality(name: str):
+    """Resolve a VideoQuality enum member by short name (LOW/MEDIUM/HIGH) across SDK versions"""
+    enum = rtc.VideoQuality
+    return getattr(enum, name.upper(), None) or getattr(enum, f"VIDEO_QUALITY_{name.upper()}")
+
+
+class SimulcastController:
+    def __init__(self, publication: Optional[Any]):
+        self.publication = publication
+        self.enabled = SIMULCAST_CONFIG["enabled"] and publication is not None \
+            and hasattr(publication, "set_video_quality")
+        self.captures = 0
+        self.capture_timeouts = 0
+
+    def _set_quality(self, name: str):
+        if self.enabled:
+            self.publication.set_video_quality(video_quality(name))
+
+    def monitor(self):
+        """Subscribe to the low layer for continuous monitoring"""
+        self._set_quality(SIMULCAST_CONFIG["monitor_quality"])
+
+    async def capture(self, mailbox, current_frame: Any) -> Any:
+        """Switch to the high layer, wait for a larger frame from the track, then drop back to low.
+
+        Falls back to current_frame if simulcast control is unavailable or the
+        high layer does not arrive in time.
+        """
+        if not self.enabled:
+            return current_frame
+
+        self.captures += 1
+        self._set_quality(SIMULCAST_CONFIG["capture_quality"])
+        try:
+            deadline = asyncio.get_running_loop().time() + SIMULCAST_CONFIG["capture_timeout"]
+            while True:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+                frame = await asyncio.wait_for(mailbox.get(), timeout)
+                if frame is None:
+                    return current_frame
+                if frame.width * frame.height > current_frame.width * current_frame.height:
+                    return frame
+        except asyncio.TimeoutError:
+            self.capture_timeouts += 1
+            return current_frame
+        finally:
+            self.monitor()
+
+    def stats(self):
+        return {"enabled": self.enabled, "captures": self.captures, "capture_timeouts": self.capture_timeouts}
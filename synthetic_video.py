@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Synthetic consultation video for offline benchmarks and load tests
+Renders a seeded "room" of furniture-like blocks and moves a hand-held camera
+between a few viewpoints in it: it holds still on each one (as a user showing
+a corner would), then pans to the next, switching to a new room every few
+seconds. Frames come out as RGBA LiveKit video frames at a chosen resolution
+and fps, so the agent's real conversion, pre-stage, dedup, cache and encode
+paths do real work.
+"""
+
+import time
+import asyncio
+from typing import AsyncIterator, Optional
+
+import numpy as np
+from livekit import rtc
+
+
+class SyntheticRoomVideo:
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 15.0,
+                 scene_seconds: float = 6.0, pan_seconds: float = 0.3, dwell_seconds: float = 0.6,
+                 seed: int = 0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_per_scene = max(1, int(scene_seconds * fps))
+        self.pan_frames = max(1, int(pan_seconds * fps))
+        self.dwell_frames = max(1, int(dwell_seconds * fps))
+        self.rng = np.random.default_rng(seed)
+        self.frame_index = 0
+        self.canvas: Optional[np.ndarray] = None
+
+    def _render_room(self) -> np.ndarray:
+        """A wall/floor backdrop three frames wide with randomly placed, shaded blocks"""
+        h, w = self.height, self.width * 3
+        canvas = np.empty((h, w, 4), dtype=np.uint8)
+        wall, floor = self.rng.integers(90, 220, size=(2, 3))
+        canvas[: h * 2 // 3, :, :3] = wall
+        canvas[h * 2 // 3:, :, :3] = floor
+        canvas[..., 3] = 255
+
+        for _ in range(int(self.rng.integers(18, 36))):
+            bw, bh = self.rng.integers(w // 20, w // 6), self.rng.integers(h // 10, h // 2)
+            x, y = self.rng.integers(0, w - bw), self.rng.integers(h // 4, h - bh)
+            color = self.rng.integers(20, 240, size=3)
+            # Vertical shading gives edges and texture for the blur/scene detectors
+            shade = np.linspace(0.7, 1.0, bh, dtype=np.float32)[:, None, None]
+            canvas[y:y + bh, x:x + bw, :3] = (color * shade).astype(np.uint8)
+
+        # Static surface grain, so held views are as sharp as real camera footage
+        # (4 px grains, so the texture survives the detectors' downscaling)
+        grain = self.rng.integers(-24, 25, size=(-(-h // 4), -(-w // 4), 1), dtype=np.int16)
+        grain = grain.repeat(4, axis=0).repeat(4, axis=1)[:h, :w]
+        canvas[..., :3] = np.clip(canvas[..., :3].astype(np.int16) + grain, 0, 255).astype(np.uint8)
+        return canvas
+
+    def next_rgba(self) -> np.ndarray:
+        """The next frame as an (height, width, 4) uint8 array"""
+        if self.canvas is None or self.frame_index % self.frames_per_scene == 0:
+            self.canvas = self._render_room()
+
+        # Hold on a viewpoint, then pan to the next (left, middle, right, middle, ...)
+        stops = (0.0, 1.0, 2.0, 1.0)
+        leg = self.dwell_frames + self.pan_frames
+        stop, step = divmod(self.frame_index % (len(stops) * leg), leg)
+        start, end = stops[stop], stops[(stop + 1) % len(stops)]
+        moving = step >= self.dwell_frames
+        offset = start + (end - start) * (step - self.dwell_frames + 1) / self.pan_frames if moving else start
+        # A few pixels of hand shake while panning, barely any while holding still
+        shake = 4 if moving else 1
+        jitter = self.rng.integers(-shake, shake + 1, size=2)
+        x = int(np.clip(offset * self.width + jitter[0], 0, self.canvas.shape[1] - self.width))
+        y_shift = int(jitter[1])
+        self.frame_index += 1
+
+        frame = self.canvas[:, x:x + self.width]
+        return np.roll(frame, y_shift, axis=0) if y_shift else frame
+
+    def next_frame(self) -> rtc.VideoFrame:
+        rgba = np.ascontiguousarray(self.next_rgba())
+        return rtc.VideoFrame(self.width, self.height, rtc.VideoBufferType.RGBA, rgba.tobytes())
+
+
+class SyntheticVideoTrack:
+    """Async-iterable stand-in for a remote video track, paced at the video's fps"""
+
+    def __init__(self, video: SyntheticRoomVideo, duration: float, sid: str = "TR_synthetic"):
+        self.video = video
+        self.duration = duration
+        self.sid = sid
+        self.kind = "video"
+        self.frames_sent = 0
+
+    async def __aiter__(self) -> AsyncIterator[rtc.VideoFrame]:
+        interval = 1.0 / self.video.fps
+        start = time.monotonic()
+        total = int(self.duration * self.video.fps)
+        for i in range(total):
+            # Absolute schedule, so slow frames do not make the whole run drift
+            delay = start + i * interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.frames_sent += 1
+            yield self.video.next_frame()
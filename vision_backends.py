@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Pluggable vision backends for room inventory analysis
+Every backend turns a list of JPEG frames into one detection per frame:
+  - OpenAIVisionBackend: the real gpt-4o-mini vision model
+  - HTTPStandInBackend: a local stand-in server (see vision_standin_server.py)
+  - FakeVisionBackend: an in-process fake with no network at all
+The stand-in and fake backends return canned or seeded-random detections
+with configurable latency and error distributions, so the whole
+frame -> inventory pipeline can be load-tested offline.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from http_pool import get_http_session, get_httpx_client
+from pipeline_metrics import PARSE, PIPELINE_METRICS
+
+logger = logging.getLogger(__name__)
+
+# Backend Configuration
+VISION_BACKEND_CONFIG = {
+    "backend": os.getenv("VISION_BACKEND", "openai"),  # openai | standin | fake
+    "model": os.getenv("VISION_MODEL", "gpt-4o-mini"),
+    "standin_url": os.getenv("VISION_STANDIN_URL", "http://127.0.0.1:8765"),
+    "mode": os.getenv("VISION_FAKE_MODE", "random"),  # random | canned
+    "seed": int(os.getenv("VISION_FAKE_SEED", "42")),
+    "latency_ms": float(os.getenv("VISION_FAKE_LATENCY_MS", "800")),  # Median latency
+    "latency_sigma": float(os.getenv("VISION_FAKE_LATENCY_SIGMA", "0.5")),  # Log-normal spread (0 = fixed)
+    "error_rate": float(os.getenv("VISION_FAKE_ERROR_RATE", "0.0")),
+}
+
+# System prompt for moving consultation
+SYSTEM_PROMPT = (
+    "You are Dave, a professional moving consultant. Analyze the room and provide a detailed inventory. "
+    "Respond with JSON only in this format: "
+    '{"room_type": "bedroom/kitchen/living_room/etc", "items":[{"name":"item_name", "qty":1, "size":"small/medium/large", "fragile":true/false}], "notes":"additional_observations"}'
+)
+
+# System prompt for batched (multi-image) analysis
+BATCH_SYSTEM_PROMPT = (
+    "You are Dave, a professional moving consultant. You will receive several numbered video frames from a home. "
+    "Analyze each frame separately and provide a detailed inventory for each. "
+    "Respond with JSON only in this format: "
+    '{"frames":[{"frame":1, "room_type": "bedroom/kitchen/living_room/etc", "items":[{"name":"item_name", "qty":1, "size":"small/medium/large", "fragile":true/false}], "notes":"additional_observations"}]}'
+)
+
+# Rooms and typical contents used by the stand-in and fake backends
+FAKE_ROOM_CATALOG = {
+    "living_room": [("sofa", "large", False), ("coffee table", "medium", False), ("tv", "large", True),
+                    ("bookshelf", "large", False), ("lamp", "small", True), ("armchair", "large", False)],
+    "bedroom": [("bed", "large", False), ("dresser", "large", False), ("nightstand", "medium", False),
+                ("mirror", "medium", True), ("wardrobe", "large", False)],
+    "kitchen": [("dining table", "large", False), ("chair", "medium", False), ("microwave", "medium", True),
+                ("dishes", "small", True), ("refrigerator", "large", False)],
+    "office": [("desk", "large", False), ("office chair", "medium", False), ("monitor", "medium", True),
+               ("filing cabinet", "medium", False), ("printer", "medium", True)],
+}
+
+
+class VisionBackendError(Exception):
+    """Raised when a backend fails to analyze frames"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def unknown_detection(notes: Optional[str] = None, error: bool = False) -> dict:
+    """Placeholder detection for frames that could not be analyzed (error=True when the request failed)"""
+    detection = {"room_type": "unknown", "items": []}
+    if notes:
+        detection["notes"] = notes
+    if error:
+        detection["error"] = True
+    return detection
+
+
+class VisionBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    async def analyze(self, images: List[bytes]) -> List[dict]:
+        """Analyze JPEG frames, returning one detection per frame in order"""
+
+    def available(self) -> bool:
+        """Whether requests are currently being accepted (False while paused, e.g. during an outage)"""
+        return True
+
+    async def close(self):
+        """Release any connections held by the backend"""
+
+
+class OpenAIVisionBackend(VisionBackend):
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.model = model or VISION_BACKEND_CONFIG["model"]
+        self._client = None
+        self._http_client = None
+        if not self.api_key:
+            logger.warning("⚠️ OPENAI_API_KEY not set - vision analysis will be limited")
+
+    @property
+    def client(self):
+        """AsyncOpenAI over the process-wide pooled transport (rebuilt if the pool was closed and recreated)"""
+        if not self.api_key:
+            return None
+        http_client = get_httpx_client()
+        if self._client is None or self._http_client is not http_client:
+            from openai import AsyncOpenAI
+
+            # Retries and timeouts are handled by vision_resilience, not stacked inside the SDK
+            self._client = AsyncOpenAI(api_key=self.api_key, http_client=http_client, max_retries=0)
+            self._http_client = http_client
+        return self._client
+
+    @staticmethod
+    def _image_part(image_bytes: bytes) -> dict:
+        b64 = base64.b64encode(image_bytes).decode()
+        return {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}}
+
+    async def analyze(self, images: List[bytes]) -> List[dict]:
+        if not self.api_key:
+            return [unknown_detection("Vision analysis not available") for _ in images]
+        if len(images) == 1:
+            return [await self._analyze_single(images[0])]
+        return await self._analyze_batch(images)
+
+    async def _complete(self, system_prompt: str, content: list) -> str:
+        try:
+            resp = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": content}
+                ],
+                temperature=0.2,
+            )
+        except Exception as e:
+            # Rate limits, timeouts and server errors are worth retrying; other client errors are not
+            status = getattr(e, "status_code", None)
+            raise VisionBackendError(str(e), retryable=status is None or status >= 500 or status in (408, 409, 429)) from e
+        return resp.choices[0].message.content
+
+    async def _analyze_single(self, image_bytes: bytes) -> dict:
+        txt = await self._complete(SYSTEM_PROMPT, [
+            {"type": "text", "text": "Analyze this room for moving inventory."},
+            self._image_part(image_bytes),
+        ])
+        try:
+            with PIPELINE_METRICS.time(PARSE):
+                return json.loads(txt)
+        except (TypeError, ValueError):
+            return unknown_detection(txt)
+
+    async def _analyze_batch(self, images: List[bytes]) -> List[dict]:
+        content = [{"type": "text", "text": f"Analyze these {len(images)} frames for moving inventory."}]
+        for i, image_bytes in enumerate(images, start=1):
+            content.append({"type": "text", "text": f"Frame {i}:"})
+            content.append(self._image_part(image_bytes))
+
+        txt = await self._complete(BATCH_SYSTEM_PROMPT, content)
+        try:
+            with PIPELINE_METRICS.time(PARSE):
+                frames = json.loads(txt).get("frames", [])
+        except (TypeError, ValueError, AttributeError):
+            return [unknown_detection(txt)] + [unknown_detection() for _ in images[1:]]
+
+        # Map results back to their frame numbers; frames the model skipped come back empty
+        by_index = {f.get("frame", i): f for i, f in enumerate(frames, start=1) if isinstance(f, dict)}
+        return [by_index.get(i, unknown_detection()) for i in range(1, len(images) + 1)]
+
+    async def close(self):
+        # The transport belongs to the shared pool (see http_pool.close_http_clients)
+        self._client = None
+        self._http_client = None
+
+
+class DetectionGenerator:
+    """Deterministic canned or seeded-random detections with simulated latency and errors"""
+
+    def __init__(self, mode: str = None, seed: int = None, latency_ms: float = None,
+                 latency_sigma: float = None, error_rate: float = None):
+        self.mode = mode or VISION_BACKEND_CONFIG["mode"]
+        self.seed = VISION_BACKEND_CONFIG["seed"] if seed is None else seed
+        self.latency_ms = VISION_BACKEND_CONFIG["latency_ms"] if latency_ms is None else latency_ms
+        self.latency_sigma = VISION_BACKEND_CONFIG["latency_sigma"] if latency_sigma is None else latency_sigma
+        self.error_rate = VISION_BACKEND_CONFIG["error_rate"] if error_rate is None else error_rate
+        self.rng = random.Random(self.seed)
+        self.calls = 0
+
+    def detection_for(self, image_bytes: bytes) -> dict:
+        """Detection for one frame; identical frames always produce identical detections"""
+        digest = hashlib.sha1(image_bytes).digest()
+        rooms = sorted(FAKE_ROOM_CATALOG)
+
+        if self.mode == "canned":
+            room = rooms[digest[0] % len(rooms)]
+            items = FAKE_ROOM_CATALOG[room][:3]
+            return {
+                "room_type": room,
+                "items": [{"name": n, "qty": 1, "size": s, "fragile": f} for n, s, f in items],
+                "notes": "Canned detection",
+            }
+
+        frame_rng = random.Random(self.seed ^ int.from_bytes(digest[:8], "big"))
+        room = frame_rng.choice(rooms)
+        catalog = FAKE_ROOM_CATALOG[room]
+        items = frame_rng.sample(catalog, frame_rng.randint(1, len(catalog)))
+        return {
+            "room_type": room,
+            "items": [{"name": n, "qty": frame_rng.randint(1, 3), "size": s, "fragile": f} for n, s, f in items],
+            "notes": f"Seeded detection ({self.seed})",
+        }
+
+    def next_latency(self) -> float:
+        """Simulated request latency in seconds (log-normal around latency_ms)"""
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return self.rng.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+
+    def next_is_error(self) -> bool:
+        return self.rng.random() < self.error_rate
+
+    async def respond(self, images: List[bytes]) -> List[dict]:
+        """Sleep for a simulated latency, then fail or return detections"""
+        self.calls += 1
+        await asyncio.sleep(self.next_latency())
+        if self.next_is_error():
+            raise VisionBackendError("Simulated vision provider error")
+        return [self.detection_for(image_bytes) for image_bytes in images]
+
+
+class FakeVisionBackend(VisionBackend):
+    name = "fake"
+
+    def __init__(self, generator: Optional[DetectionGenerator] = None):
+        self.generator = generator or DetectionGenerator()
+
+    async def analyze(self, images: List[bytes]) -> List[dict]:
+        return await self.generator.respond(images)
+
+
+class HTTPStandInBackend(VisionBackend):
+    name = "standin"
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = (url or VISION_BACKEND_CONFIG["standin_url"]).rstrip("/")
+
+    async def analyze(self, images: List[bytes]) -> List[dict]:
+        import aiohttp
+
+        payload = {"images": [base64.b64encode(image_bytes).decode() for image_bytes in images]}
+        try:
+            async with get_http_session().post(f"{self.url}/analyze", json=payload) as response:
+                if response.status != 200:
+                    raise VisionBackendError(f"Stand-in server error: {response.status}",
+                                             retryable=response.status >= 500 or response.status == 429)
+                with PIPELINE_METRICS.time(PARSE):
+                    data = await response.json()
+        except aiohttp.ClientError as e:
+            raise VisionBackendError(str(e)) from e
+        except ValueError as e:
+            raise VisionBackendError(f"Stand-in server sent invalid JSON: {e}") from e
+
+        detections = data.get("detections") if isinstance(data, dict) else None
+        if not isinstance(detections, list) or len(detections) != len(images):
+            raise VisionBackendError("Stand-in server sent a malformed response")
+        return detections
+
+
+VISION_BACKENDS: Dict[str, type] = {
+    OpenAIVisionBackend.name: OpenAIVisionBackend,
+    HTTPStandInBackend.name: HTTPStandInBackend,
+    FakeVisionBackend.name: FakeVisionBackend,
+}
+
+
+def create_vision_backend(name: Optional[str] = None) -> VisionBackend:
+    """Create the configured vision backend (VISION_BACKEND=openai|standin|fake)"""
+    name = name or VISION_BACKEND_CONFIG["backend"]
+    if name not in VISION_BACKENDS:
+        raise ValueError(f"Unknown vision backend: {name} (expected one of {', '.join(VISION_BACKENDS)})")
+    logger.info(f"👁️ Using {name} vision backend")
+    return VISION_BACKENDS[name]()
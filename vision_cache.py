@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for vision analysis results
+Detections are keyed by the perceptual hash of the analyzed frame, so a view
+the client pans back to is served from the cache instead of a new paid call.
+Entries are bounded (LRU) and expire (TTL); the cache can be persisted to
+disk per consultation so results survive a reconnect.
+"""
+
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from frame_fingerprint import hamming_distance
+
+logger = logging.getLogger(__name__)
+
+# Cache Configuration
+VISION_CACHE_CONFIG = {
+    "max_entries": int(os.getenv("VISION_CACHE_MAX_ENTRIES", "512")),
+    "ttl_seconds": float(os.getenv("VISION_CACHE_TTL_SECONDS", "1800")),
+    "max_distance": int(os.getenv("VISION_CACHE_MAX_DISTANCE", "4")),  # Hamming bits for a near hit
+    "cache_dir": os.getenv("VISION_CACHE_DIR"),  # Unset disables persistence
+}
+
+
+class VisionResultCache:
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None,
+                 max_distance: int = None, path: Optional[str] = None):
+        self.max_entries = max_entries or VISION_CACHE_CONFIG["max_entries"]
+        self.ttl_seconds = ttl_seconds or VISION_CACHE_CONFIG["ttl_seconds"]
+        self.max_distance = VISION_CACHE_CONFIG["max_distance"] if max_distance is None else max_distance
+        self.path = path
+        self.entries: "OrderedDict[int, Tuple[float, dict]]" = OrderedDict()  # hash -> (stored_at, detection)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def for_consultation(cls, consultation_id: str) -> "VisionResultCache":
+        """Create a cache persisted under VISION_CACHE_DIR for one consultation, loading prior results"""
+        cache_dir = VISION_CACHE_CONFIG["cache_dir"]
+        if not cache_dir:
+            return cls()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in consultation_id)
+        cache = cls(path=os.path.join(cache_dir, f"{safe_id}.json"))
+        cache.load()
+        return cache
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return now - stored_at > self.ttl_seconds
+
+    def get(self, frame_hash: int) -> Optional[dict]:
+        """Look up a detection for a frame hash, allowing near matches within max_distance.
+
+        Expired entries met along the way are evicted and the scan moves on,
+        so a stale near match does not hide a fresh one.
+        """
+        now = time.time()
+        candidates = [frame_hash] if frame_hash in self.entries else []
+        if self.max_distance > 0:
+            candidates += [k for k in self.entries
+                           if k != frame_hash and hamming_distance(k, frame_hash) <= self.max_distance]
+
+        for key in candidates:
+            stored_at, detection = self.entries[key]
+            if not self._expired(stored_at, now):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return detection
+            del self.entries[key]
+            self.expirations += 1
+
+        self.misses += 1
+        return None
+
+    def put(self, frame_hash: int, detection: dict):
+        """Store a detection, evicting the least recently used entry when full"""
+        self.entries[frame_hash] = (time.time(), detection)
+        self.entries.move_to_end(frame_hash)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def purge_expired(self):
+        """Drop every entry past its TTL"""
+        now = time.time()
+        for key in [k for k, (stored_at, _) in self.entries.items() if self._expired(stored_at, now)]:
+            del self.entries[key]
+            self.expirations += 1
+
+    def load(self):
+        """Load persisted entries, skipping any that have expired"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            now = time.time()
+            for key, stored_at, detection in data.get("entries", []):
+                if not self._expired(stored_at, now):
+                    self.entries[int(key, 16)] = (stored_at, detection)
+            logger.info(f"🗃️ Loaded {len(self.entries)} cached vision results from {self.path}")
+        except Exception as e:
+            logger.error(f"❌ Error loading vision cache: {e}")
+
+    def save(self):
+        """Persist entries to disk (oldest first, so LRU order survives a reload)"""
+        if not self.path:
+            return
+        try:
+            self.purge_expired()
+            entries = [[f"{key:x}", stored_at, detection] for key, (stored_at, detection) in self.entries.items()]
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"entries": entries}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"❌ Error saving vision cache: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss/eviction counters for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Retries, hedging and circuit breaking for vision requests
+ResilientVisionBackend wraps any VisionBackend. Every attempt has its own
+timeout, retryable failures are retried with full-jitter exponential
+backoff, and a call that runs past the observed p95 latency can get a hedged
+duplicate (the first success wins and the other is cancelled). Consecutive
+failures open a circuit breaker that pauses analysis during provider
+outages, and after a cool-down a single probe decides whether to close it
+again. Tail latency stays bounded by timeout x attempts plus backoff.
+Retries and hedges are real provider requests, so when the caller passes an
+acquire hook each one takes rate-limit quota first; a retry without quota is
+skipped and a hedge without immediately free quota is not sent.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from pipeline_metrics import metrics_server
+from vision_backends import VisionBackend, VisionBackendError
+
+logger = logging.getLogger(__name__)
+
+# Resilience Configuration
+RESILIENCE_CONFIG = {
+    "attempt_timeout": float(os.getenv("VISION_ATTEMPT_TIMEOUT", "20")),  # Seconds per attempt
+    "max_attempts": int(os.getenv("VISION_MAX_ATTEMPTS", "3")),
+    "backoff_base": float(os.getenv("VISION_BACKOFF_BASE", "0.5")),  # Seconds, doubled per retry
+    "backoff_max": float(os.getenv("VISION_BACKOFF_MAX", "8")),
+    "hedge": os.getenv("VISION_HEDGE", "false").lower() == "true",
+    "hedge_percentile": float(os.getenv("VISION_HEDGE_PERCENTILE", "0.95")),
+    "hedge_min_samples": int(os.getenv("VISION_HEDGE_MIN_SAMPLES", "20")),  # Latencies needed before hedging
+    "breaker_failures": int(os.getenv("VISION_BREAKER_FAILURES", "5")),  # Consecutive failures that open it
+    "breaker_cooldown": float(os.getenv("VISION_BREAKER_COOLDOWN", "30")),  # Seconds before a probe is allowed
+}
+
+AcquireFn = Callable[..., Awaitable[bool]]  # acquire(wait=True) -> whether quota was granted
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = None, cooldown: float = None):
+        self.failure_threshold = failure_threshold or RESILIENCE_CONFIG["breaker_failures"]
+        self.cooldown = RESILIENCE_CONFIG["breaker_cooldown"] if cooldown is None else cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+
+    def available(self) -> bool:
+        """Whether a call would be let through right now (does not claim the half-open probe)"""
+        return self.state == CLOSED or (self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown)
+
+    def allow(self) -> bool:
+        """Claim permission for a call; after the cool-down exactly one probe goes through"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info("✅ Vision circuit breaker closed - provider recovered")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opens += 1
+                logger.warning(f"🔌 Vision circuit breaker open - pausing analysis for {self.cooldown:.0f}s "
+                               f"after {self.consecutive_failures} consecutive failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self):
+        """A call was abandoned without an outcome; a cancelled probe must not leave the breaker half open"""
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class ResilientVisionBackend(VisionBackend):
+    def __init__(self, backend: VisionBackend, latency_window: int = 200):
+        self.backend = backend
+        self.name = f"resilient-{backend.name}"
+        self.breaker = CircuitBreaker()
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.counters = {
+            "calls": 0, "attempts": 0, "retries": 0, "timeouts": 0, "failures": 0,
+            "hedges": 0, "hedge_wins": 0, "short_circuited": 0, "quota_denied": 0,
+        }
+        metrics_server.add_renderer(self.render)
+
+    def available(self) -> bool:
+        return self.breaker.available()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Observed latency percentile after which a hedged duplicate is sent (None = no hedging)"""
+        if not RESILIENCE_CONFIG["hedge"] or len(self.latencies) < RESILIENCE_CONFIG["hedge_min_samples"]:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(RESILIENCE_CONFIG["hedge_percentile"] * len(ordered)))]
+
+    async def _attempt(self, images: List[bytes]) -> List[dict]:
+        self.counters["attempts"] += 1
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self.backend.analyze(images), RESILIENCE_CONFIG["attempt_timeout"])
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise VisionBackendError(f"Vision request timed out after {RESILIENCE_CONFIG['attempt_timeout']:.0f}s")
+        self.latencies.append(time.monotonic() - start)
+        return result
+
+    async def _hedged_attempt(self, images: List[bytes], acquire: Optional[AcquireFn] = None) -> List[dict]:
+        """One attempt, plus a duplicate if the first is slower than the hedge delay; first success wins"""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._attempt(images)
+
+        primary = asyncio.create_task(self._attempt(images))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if acquire and not await acquire(wait=False):
+                self.counters["quota_denied"] += 1
+                return await primary
+
+            self.counters["hedges"] += 1
+            hedge = asyncio.create_task(self._attempt(images))
+            tasks.append(hedge)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The loser, or both requests if the caller was cancelled, must not keep running
+            leftover = [task for task in tasks if not task.done()]
+            for task in leftover:
+                task.cancel()
+            if leftover:
+                await asyncio.gather(*leftover, return_exceptions=True)
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter exponential backoff for the given retry number (1-based)"""
+        ceiling = min(RESILIENCE_CONFIG["backoff_max"], RESILIENCE_CONFIG["backoff_base"] * 2 ** (retry - 1))
+        return random.uniform(0, ceiling)
+
+    async def analyze(self, images: List[bytes], acquire: Optional[AcquireFn] = None) -> List[dict]:
+        """Analyze with retries and hedging; acquire (if given) is called before every extra request"""
+        self.counters["calls"] += 1
+        for attempt in range(1, RESILIENCE_CONFIG["max_attempts"] + 1):
+            if not self.breaker.allow():
+                self.counters["short_circuited"] += 1
+                raise VisionBackendError("Vision provider unavailable (circuit open)", retryable=False)
+            try:
+                result = await self._hedged_attempt(images, acquire)
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except VisionBackendError as e:
+                self.counters["failures"] += 1
+                if not e.retryable:
+                    # The provider answered (e.g. a rejected request), so this is not an outage
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                # Nothing left to try, or this failure opened the breaker: fail before backoff and quota are spent
+                if attempt == RESILIENCE_CONFIG["max_attempts"] or not self.breaker.available():
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"⚠️ Vision attempt {attempt} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                if acquire and not await acquire():
+                    # Retrying without quota would only add to the 429s
+                    self.counters["quota_denied"] += 1
+                    raise
+                self.counters["retries"] += 1
+                continue
+            except Exception:
+                # A backend bug or malformed response is still a failed call, not a missing outcome
+                self.counters["failures"] += 1
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **self.counters,
+            "breaker_state": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "hedge_delay_ms": (self.hedge_delay() or 0.0) * 1000,
+        }
+
+    def render(self) -> str:
+        """Prometheus counters and breaker state"""
+        lines = [
+            "# HELP dave_vision_requests_total Vision resilience events by kind",
+            "# TYPE dave_vision_requests_total counter",
+        ]
+        lines += [f'dave_vision_requests_total{{event="{event}"}} {count}' for event, count in self.counters.items()]
+        lines += [
+            "# HELP dave_vision_breaker_state Circuit breaker state (0 closed, 1 half open, 2 open)",
+            "# TYPE dave_vision_breaker_state gauge",
+            f"dave_vision_breaker_state {[CLOSED, HALF_OPEN, OPEN].index(self.breaker.state)}",
+            "# HELP dave_vision_breaker_opens_total Times the circuit breaker opened",
+            "# TYPE dave_vision_breaker_opens_total counter",
+            f"dave_vision_breaker_opens_total {self.breaker.opens}",
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Local Vision Stand-in Server
+Serves canned or seeded-random room detections over HTTP with configurable
+latency and error distributions, so the agent's vision pipeline can be
+load-tested without spending real OpenAI quota.
+
+Usage:
+    python vision_standin_server.py --port 8765 --latency-ms 800 --error-rate 0.02
+    VISION_BACKEND=standin python enhanced_anam_agent.py dev
+"""
+
+import argparse
+import base64
+import logging
+
+from aiohttp import web
+
+from vision_backends import DetectionGenerator, VisionBackendError
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def create_app(generator: DetectionGenerator) -> web.Application:
+    """Build the stand-in aiohttp application"""
+
+    async def analyze(request: web.Request) -> web.Response:
+        data = await request.json()
+        images = [base64.b64decode(image) for image in data.get("images", [])]
+        try:
+            detections = await generator.respond(images)
+        except VisionBackendError as e:
+            return web.json_response({"error": str(e)}, status=503)
+        return web.json_response({"detections": detections})
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "calls": generator.calls})
+
+    app = web.Application(client_max_size=32 * 1024 * 1024)
+    app.router.add_post("/analyze", analyze)
+    app.router.add_get("/health", health)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vision stand-in server for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["random", "canned"], default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--latency-ms", type=float, default=None, help="Median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=None, help="Log-normal latency spread (0 = fixed)")
+    parser.add_argument("--error-rate", type=float, default=None, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    generator = DetectionGenerator(
+        mode=args.mode,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+    )
+    logger.info(f"🧪 Vision stand-in on http://{args.host}:{args.port} "
+                f"(mode={generator.mode}, latency={generator.latency_ms}ms, errors={generator.error_rate:.1%})")
+    web.run_app(create_app(generator), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
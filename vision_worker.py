@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Bounded-concurrency vision worker pool
+Encoded frames are handed off to a bounded queue without waiting for the
+analysis; a fixed number of workers run the async vision calls and hand each
+detection to a result callback as soon as it completes. Workers can batch
+up to N queued frames (or whatever arrives within a time window) into a
+single multi-image request. Jobs are queued per track and taken in fair
+round-robin order, so every camera gets a share of the concurrency budget.
+"""
+
+import asyncio
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fair_scheduler import FairScheduler
+
+logger = logging.getLogger(__name__)
+
+# Worker Pool Configuration
+VISION_WORKER_CONFIG = {
+    "concurrency": int(os.getenv("VISION_CONCURRENCY", "2")),  # Max in-flight vision requests
+    "queue_size": int(os.getenv("VISION_QUEUE_SIZE", "8")),  # Frames waiting for a worker, per track
+    "overflow": os.getenv("VISION_QUEUE_OVERFLOW", "drop_oldest"),  # drop_oldest | reject
+    "batch_size": int(os.getenv("VISION_BATCH_SIZE", "1")),  # Frames per request (1 disables batching)
+    "batch_max_wait": float(os.getenv("VISION_BATCH_MAX_WAIT", "0.5")),  # Seconds to wait to fill a batch
+}
+
+
+@dataclass
+class VisionJob:
+    image_bytes: bytes
+    frame_hash: Optional[int] = None  # Perceptual hash, used as the result cache key
+    key: str = "default"  # Fair-scheduling key, usually the video track
+    capture: bool = False  # User-triggered capture rather than a passively selected keyframe
+    priority: int = 2  # Rate-limit class (rate_limiter.CAPTURE / NEW_SCENE / REFRESH)
+    captured_at: Optional[float] = None  # When the source frame arrived (monotonic), for end-to-end latency
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None  # When a worker took the job off the queue
+
+
+AnalyzeFn = Callable[[List[bytes], int], Awaitable[List[dict]]]  # (images, priority) -> one detection per image
+ResultFn = Callable[[VisionJob, dict], Awaitable[None]]
+AdmitFn = Callable[[List[VisionJob]], Awaitable[bool]]  # False sheds the batch without a request
+DiscardFn = Callable[[VisionJob], None]  # An accepted job that will never get a result
+
+
+class VisionWorkerPool:
+    def __init__(self, analyze: AnalyzeFn, on_result: ResultFn,
+                 concurrency: int = None, queue_size: int = None, overflow: str = None,
+                 batch_size: int = None, batch_max_wait: float = None, admit: Optional[AdmitFn] = None,
+                 on_discard: Optional[DiscardFn] = None):
+        self.analyze = analyze
+        self.on_result = on_result
+        self.admit = admit
+        self.on_discard = on_discard
+        self.concurrency = concurrency or VISION_WORKER_CONFIG["concurrency"]
+        self.overflow = overflow or VISION_WORKER_CONFIG["overflow"]
+        self.batch_size = max(1, batch_size or VISION_WORKER_CONFIG["batch_size"])
+        self.batch_max_wait = VISION_WORKER_CONFIG["batch_max_wait"] if batch_max_wait is None else batch_max_wait
+        self.scheduler = FairScheduler(queue_size or VISION_WORKER_CONFIG["queue_size"], self.overflow)
+        self.workers: List[asyncio.Task] = []
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.shed = 0
+        self.in_flight = 0
+        self.requests = 0
+
+    def start(self):
+        """Spawn the worker tasks (idempotent)"""
+        if self.workers:
+            return
+        for i in range(self.concurrency):
+            self.workers.append(asyncio.create_task(self._worker(i)))
+        logger.info(f"👷 Vision worker pool started ({self.concurrency} workers)")
+
+    def submit(self, job: VisionJob) -> bool:
+        """Queue a frame for analysis without awaiting the result.
+
+        Returns False when the frame was not accepted because its track's queue
+        is full and the overflow policy is "reject".
+        """
+        self.start()
+
+        displaced = self.scheduler.put(job.key, job)
+        if displaced is job:
+            self.dropped += 1
+            return False
+        if displaced is not None:
+            # The stalest queued frame for this track made room for the new one
+            self.dropped += 1
+            self._discard([displaced])
+        else:
+            self._unfinished += 1
+            self._idle.clear()
+
+        self.submitted += 1
+        return True
+
+    def remove_track(self, key: str):
+        """Discard queued frames for a track that has ended"""
+        queued = list(self.scheduler.queues.get(key, ()))
+        discarded = self.scheduler.remove(key)
+        if discarded:
+            self.dropped += discarded
+            self._discard(queued)
+            self._task_done(discarded)
+
+    def _discard(self, jobs: List[VisionJob]):
+        if self.on_discard:
+            for job in jobs:
+                self.on_discard(job)
+
+    def _task_done(self, count: int = 1):
+        self._unfinished -= count
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._idle.set()
+
+    async def _next_batch(self) -> List[VisionJob]:
+        """Wait for one job, then gather more until the batch is full or max wait elapses"""
+        batch = [await self.scheduler.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_max_wait
+
+        while len(batch) < self.batch_size:
+            job = self.scheduler.get_nowait()
+            if job is not None:
+                batch.append(job)
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.scheduler.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self, worker_id: int):
+        while True:
+            batch = await self._next_batch()
+            started_at = time.monotonic()
+            for job in batch:
+                job.started_at = started_at
+            self.in_flight += len(batch)
+            delivered = 0  # Jobs handed to on_result so far
+            try:
+                # Wait for provider quota; a batch that would wait too long is shed
+                if self.admit and not await self.admit(batch):
+                    self.shed += len(batch)
+                    self._discard(batch)
+                    continue
+                self.requests += 1
+                detections = await self.analyze([job.image_bytes for job in batch], min(job.priority for job in batch))
+                for job, detection in zip(batch, detections):
+                    self.completed += 1
+                    await self.on_result(job, detection)
+                    delivered += 1
+            except asyncio.CancelledError:
+                self._discard(batch[delivered:])
+                raise
+            except Exception as e:
+                self.failed += len(batch) - delivered
+                self._discard(batch[delivered:])
+                logger.error(f"❌ Vision worker {worker_id} error: {e}")
+            finally:
+                self.in_flight -= len(batch)
+                self._task_done(len(batch))
+
+    async def join(self):
+        """Wait until every accepted frame has been analyzed and its result handled"""
+        await self._idle.wait()
+
+    async def stop(self, drain_timeout: Optional[float] = 10.0):
+        """Optionally wait for queued frames to finish, then cancel the workers"""
+        if drain_timeout and self.workers:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Vision queue did not drain before shutdown")
+
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def stats(self) -> Dict[str, int]:
+        """Queue and throughput counters"""
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "shed": self.shed,
+            "queued": self.scheduler.qsize(),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "frames_per_request": self.completed / self.requests if self.requests else 0.0,
+        }